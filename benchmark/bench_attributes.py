@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Attribute style access to configuration items '''
+
+# Project specific imports
+from context import measure, print_results
+from generators import make_tree
+from ycfg.collections import folded_keys_dict
+from ycfg.config_file import items_as_attributes
+from ycfg.schema import schema
+
+# Standard imports
+import argparse
+
+
+def benchmarks(depth=4, width=10):
+    tree = make_tree(depth, width)
+
+    folded = folded_keys_dict(tree)
+    plain = items_as_attributes(tree)
+
+    # NOTE Describe only the path being read, other items are passed through
+    typed = schema('level4', allow_extra=True, key4=object)
+    for level in range(3, 0, -1):
+        typed = schema('level{}'.format(level), allow_extra=True, **{'key{}'.format(level): typed})
+    typed = typed.load(tree)
+
+    yield 'attributes/folded_keys_dict', lambda: folded.key1.key2.key3.key4
+    yield 'attributes/items_as_attributes', lambda: plain.key1.key2.key3.key4
+    yield 'attributes/schema_record', lambda: typed.key1.key2.key3.key4
+    yield 'attributes/folded_keys_dict/data-method', lambda: folded.copy
+    yield 'attributes/folded_keys_dict/shallow', lambda: folded.key1
+    yield 'attributes/folded_keys_dict/missing', lambda: getattr(folded, 'missing', None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=10)
+    args = parser.parse_args()
+
+    print_results([
+        (name, measure(func))
+        for name, func in benchmarks(width=args.width)
+      ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Layer count vs. lookup latency of dict_stack '''
+
+# Project specific imports
+from context import measure, print_results
+from ycfg.collections import dict_stack, folded_keys_dict
+
+# Standard imports
+import argparse
+
+
+def make_layer(layer, keys):
+    return folded_keys_dict({
+        'section{}.key{}'.format(i % 10, i): '{}/{}'.format(layer, i)
+        for i in range(keys)
+      })
+
+
+def benchmarks(max_layers=6, keys=1000):
+    for count in range(1, max_layers + 1):
+        layers = [make_layer(layer, keys) for layer in range(count)]
+
+        def _cold(layers=layers):
+            dict_stack(*layers)['section5.key5']
+
+        s = dict_stack(*layers)
+
+        yield 'layers={}/leaf/cold'.format(count), _cold
+        yield 'layers={}/leaf/warm'.format(count), lambda s=s: s['section5.key5']
+        yield 'layers={}/subtree/warm'.format(count), lambda s=s: s['section5']
+
+        m = s.merged()
+        yield 'layers={}/leaf/merged'.format(count), lambda m=m: m['section5.key5']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--layers', type=int, default=6)
+    parser.add_argument('--keys', type=int, default=1000)
+    args = parser.parse_args()
+
+    print_results([
+        (name, measure(func, number=1000))
+        for name, func in benchmarks(args.layers, args.keys)
+      ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Serial vs. parallel loading of a configuration directory '''
+
+# Project specific imports
+from context import measure, print_results
+from generators import make_tree, to_yaml
+from ycfg.directory import load_directory
+
+# Standard imports
+import argparse
+import atexit
+import os
+import pathlib
+import shutil
+import tempfile
+
+
+def make_directory(files, width):
+    directory = pathlib.Path(tempfile.mkdtemp())
+    atexit.register(shutil.rmtree, str(directory))
+
+    for i in range(files):
+        with (directory / '{:04}.yaml'.format(i)).open('w') as f:
+            f.write(to_yaml({'file{}'.format(i): make_tree(3, width)}))
+
+    return directory
+
+
+def benchmarks(files=64, width=10):
+    directory = make_directory(files, width)
+
+    workers = 1
+    while True:
+        yield 'load_directory/workers={}'.format(workers), lambda workers=workers: load_directory(directory, max_workers=workers)
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count() or 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=64)
+    parser.add_argument('--width', type=int, default=10)
+    args = parser.parse_args()
+
+    print_results([
+        (name, measure(func, number=1, repeat=3))
+        for name, func in benchmarks(args.files, args.width)
+      ])
+
+
+if __name__ == '__main__':
+    main()
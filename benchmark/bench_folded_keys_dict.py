@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Dotted key lookups in regular and indexed folded_keys_dict '''
+
+# Project specific imports
+from context import measure, print_results
+from ycfg.collections import folded_keys_dict, key_path
+
+# Standard imports
+import argparse
+
+
+def make_deep_tree(depth):
+    return {'.'.join('level{}'.format(i) for i in range(depth)): 'leaf'}
+
+
+def make_wide_tree(width):
+    return {'key{}.value'.format(i): i for i in range(width)}
+
+
+def benchmarks(depth=32, width=10000):
+    deep_key = '.'.join('level{}'.format(i) for i in range(depth))
+    wide_key = 'key{}.value'.format(width // 2)
+
+    for kind, data, key in [('deep', make_deep_tree(depth), deep_key), ('wide', make_wide_tree(width), wide_key)]:
+        for indexed in (False, True):
+            d = folded_keys_dict(data, indexed=indexed)
+            name = '{}/{}'.format(kind, 'indexed' if indexed else 'regular')
+            yield '{}/getitem'.format(name), lambda d=d, key=key: d[key]
+            yield '{}/contains'.format(name), lambda d=d, key=key: key in d
+            yield '{}/key_path'.format(name), lambda d=d, path=key_path(key): path(d)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--depth', type=int, default=32)
+    parser.add_argument('--width', type=int, default=10000)
+    args = parser.parse_args()
+
+    print_results([
+        (name, measure(func, number=10000))
+        for name, func in benchmarks(args.depth, args.width)
+      ])
+
+
+if __name__ == '__main__':
+    main()
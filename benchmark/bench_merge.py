@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Deep merge of several configuration trees '''
+
+# Project specific imports
+from context import measure, print_results
+from generators import make_tree
+from ycfg.collections import folded_keys_dict, frozen_folded_keys_dict, merge
+
+# Standard imports
+import argparse
+
+
+def benchmarks(max_layers=4, depth=3, width=10):
+    base = make_tree(depth, width)
+
+    for count in range(2, max_layers + 1):
+        # NOTE Every layer overrides a few leaves and adds an own section
+        layers = [folded_keys_dict(base)] + [
+            folded_keys_dict({
+                'key0.key1.key2': layer
+              , 'key5.key5.key5': layer
+              , 'layer{}'.format(layer): make_tree(depth - 1, width)
+              })
+            for layer in range(1, count)
+          ]
+        frozen = [frozen_folded_keys_dict(layer) for layer in layers]
+
+        yield 'layers={}/folded'.format(count), lambda layers=layers: merge(*layers)
+        yield 'layers={}/frozen'.format(count), lambda layers=frozen: merge(*layers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--layers', type=int, default=4)
+    args = parser.parse_args()
+
+    print_results([
+        (name, measure(func))
+        for name, func in benchmarks(args.layers)
+      ])
+
+
+if __name__ == '__main__':
+    main()
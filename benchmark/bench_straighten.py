@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Construction of folded_keys_dict from flat and nested inputs '''
+
+# Project specific imports
+from context import measure, print_results
+from generators import make_flat, make_tree
+from ycfg.collections import folded_keys_dict
+
+# Standard imports
+import argparse
+
+
+def benchmarks(keys=10000, depth=4):
+    flat = make_flat(keys, depth)
+    shared = make_flat(keys, depth * 4, width=2)
+    nested = make_tree(depth, max(2, int(round(keys ** (1.0 / depth)))))
+
+    yield 'straighten/flat/keys={}'.format(keys), lambda: folded_keys_dict(flat)
+    yield 'straighten/shared-prefix/keys={}'.format(keys), lambda: folded_keys_dict(shared)
+    yield 'straighten/nested/depth={}'.format(depth), lambda: folded_keys_dict(nested)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--depth', type=int, default=4)
+    args = parser.parse_args()
+
+    print_results([
+        (name, measure(func, repeat=3))
+        for name, func in benchmarks(args.keys, args.depth)
+      ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Compare ways to load a configuration '''
+
+# Project specific imports
+from context import measure, print_results
+from generators import make_tree, to_yaml
+from ycfg.binary import compile_config, mapped_config
+from ycfg.yaml import default_loader, load_lazy, ordered_dict_loader
+
+# Standard imports
+import argparse
+import atexit
+import collections
+import pathlib
+import shutil
+import tempfile
+import yaml
+
+
+def make_document(sections, keys):
+    def _leaf(path):
+        return collections.OrderedDict([('name', path), ('number', len(path)), ('list', '[one, two, three]')])
+
+    return to_yaml(collections.OrderedDict(
+        ('section_{}'.format(s), make_tree(1, keys, _leaf))
+        for s in range(sections)
+      ))
+
+
+def benchmarks(sections=50, keys=100):
+    document = make_document(sections, keys)
+
+    yield 'yaml.ordered_dict_loader', lambda: yaml.load(document, ordered_dict_loader)
+
+    if hasattr(yaml, 'CLoader'):
+        from ycfg.yaml import ordered_dict_c_loader
+        yield 'yaml.ordered_dict_c_loader', lambda: yaml.load(document, ordered_dict_c_loader)
+
+    yield 'yaml.load_lazy', lambda: load_lazy(document, default_loader)
+    yield 'yaml.load_lazy+one section', lambda: load_lazy(document, default_loader)['section_0']
+
+    work_dir = pathlib.Path(tempfile.mkdtemp())
+    atexit.register(shutil.rmtree, str(work_dir))
+    with (work_dir / 'config.yaml').open('w') as f:
+        f.write(document)
+    compile_config(work_dir / 'config.yaml', work_dir / 'config.bin')
+
+    def _mapped():
+        with mapped_config(work_dir / 'config.bin') as c:
+            c['section_0.key0.name']
+
+    yield 'binary.mapped_config+one key', _mapped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sections', type=int, default=50)
+    parser.add_argument('--keys', type=int, default=100)
+    args = parser.parse_args()
+
+    print_results([
+        (name, measure(func))
+        for name, func in benchmarks(args.sections, args.keys)
+      ])
+
+
+if __name__ == '__main__':
+    main()
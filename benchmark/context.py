@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Helper functions for benchmarks '''
+
+# Standard imports
+import os
+import sys
+import timeit
+
+
+# NOTE DO NOT REMOVE
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(func, number=None, repeat=5, min_time=0.1):
+    '''
+        Return the best time (in seconds) of a single call to `func`.
+
+        If `number` of calls per repetition is not given, it is chosen
+        to make a repetition last at least `min_time` seconds.
+    '''
+    timer = timeit.Timer(func)
+
+    if number is None:
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= min_time:
+                break
+            number *= 10 if elapsed * 10 < min_time else 2
+
+    return min(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def print_results(results):
+    '''
+        Print `(name, seconds)` pairs as a table.
+    '''
+    if not results:
+        print('No benchmarks matched')
+        return
+
+    width = max(len(name) for name, _ in results)
+    for name, seconds in results:
+        print('{:<{width}}  {:>12.3f} us'.format(name, seconds * 1e6, width=width))
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Synthetic configuration generators for benchmarks '''
+
+# Standard imports
+import collections
+
+
+def make_tree(depth, width, leaf=lambda path: path):
+    '''
+        Make nested ordered dictionaries `depth` levels deep w/ `width`
+        items at every level. Leaves are produced by the `leaf` function
+        from their dotted path.
+    '''
+    def _make(level, prefix):
+        result = collections.OrderedDict()
+        for i in range(width):
+            key = 'key{}'.format(i)
+            path = prefix + key
+            result[key] = _make(level + 1, path + '.') if level + 1 < depth else leaf(path)
+        return result
+
+    return _make(0, '')
+
+
+def make_flat(count, depth, width=10):
+    '''
+        Make a dictionary of `count` dotted keys w/ `depth` components
+        sharing common prefixes (every component takes `width` values).
+    '''
+    result = collections.OrderedDict()
+    for i in range(count):
+        parts = []
+        n = i
+        for _ in range(depth - 1):
+            n, rest = divmod(n, width)
+            parts.append('key{}'.format(rest))
+        parts.append('leaf{}'.format(i))
+        result['.'.join(parts)] = i
+    return result
+
+
+def make_chain(depth):
+    '''
+        Make a single dotted key w/ `depth` components.
+    '''
+    return '.'.join('level{}'.format(i) for i in range(depth))
+
+
+def to_yaml(data, indent=0):
+    '''
+        Render nested mappings as a block style YAML document.
+    '''
+    lines = []
+    stack = [(iter(data.items()), indent)]
+    while stack:
+        items, indent = stack[-1]
+        item = next(items, None)
+        if item is None:
+            stack.pop()
+            continue
+
+        key, value = item
+        if isinstance(value, collections.Mapping):
+            lines.append('{}{}:'.format(' ' * indent, key))
+            stack.append((iter(value.items()), indent + 2))
+        else:
+            lines.append('{}{}: {}'.format(' ' * indent, key, value))
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Memory used by folded trees built w/ different node factories '''
+
+# Project specific imports
+import context
+from generators import make_flat
+from ycfg.collections import \
+    compact_node_factory \
+  , dict_and_value_node_factory \
+  , dict_node_factory \
+  , folded_keys_dict
+
+# Standard imports
+import argparse
+import gc
+import tracemalloc
+
+
+FACTORIES = [
+    ('dict_node_factory', dict_node_factory)
+  , ('dict_and_value_node_factory', dict_and_value_node_factory)
+  , ('compact_node_factory', compact_node_factory)
+  , ('compact_node_factory/intern_keys', lambda: compact_node_factory(intern_keys=True))
+  ]
+
+
+def measure_memory(factory, data):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        d = folded_keys_dict(node_factory=factory())
+        for key, value in data.items():
+            d[key] = value
+        size, _ = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=100000)
+    parser.add_argument('--depth', type=int, default=4)
+    args = parser.parse_args()
+
+    data = make_flat(args.keys, args.depth)
+
+    width = max(len(name) for name, _ in FACTORIES)
+    for name, factory in FACTORIES:
+        print('{:<{width}}  {:>10.1f} MiB'.format(name, measure_memory(factory, data) / 2 ** 20, width=width))
+
+
+if __name__ == '__main__':
+    main()
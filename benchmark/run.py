@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Run all benchmarks and optionally save results as JSON '''
+
+# Project specific imports
+from context import measure, print_results
+import ycfg.version
+
+# Standard imports
+import argparse
+import importlib
+import json
+import pathlib
+import platform
+import time
+
+
+def discover():
+    for filename in sorted(pathlib.Path(__file__).parent.glob('bench_*.py')):
+        yield importlib.import_module(filename.stem)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-k', '--filter', default='', help='run only benchmarks w/ the given substring in a name')
+    parser.add_argument('-o', '--output', type=pathlib.Path, help='write results to the given JSON file')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for module in discover():
+        for name, func in module.benchmarks():
+            if args.filter in name:
+                results.append((name, measure(func, repeat=args.repeat)))
+
+    print_results(results)
+
+    if args.output is not None:
+        report = {
+            'version': ycfg.version.__version__
+          , 'python': platform.python_version()
+          , 'implementation': platform.python_implementation()
+          , 'machine': platform.machine()
+          , 'timestamp': int(time.time())
+          , 'results': {name: seconds for name, seconds in results}
+          }
+        with args.output.open('w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
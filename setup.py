@@ -40,8 +40,11 @@ setup(
       , 'License :: OSI Approved :: GNU General Public License v3 or later (GPLv3+)'
       , 'Natural Language :: English'
       , 'Programming Language :: Python :: 3'
+      , 'Programming Language :: Python :: 3.5'
+      , 'Programming Language :: Python :: 3.6'
       ]
   , keywords         = ''
+  , python_requires  = '>=3.5'
   , install_requires = get_requirements_from('requirements.txt')
   , test_suite       = 'test'
   , tests_require    = get_requirements_from('test-requirements.txt')
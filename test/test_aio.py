@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for aio module '''
+
+# Project specific imports
+from context import make_data_filename
+from ycfg.aio import load, load_many
+
+# Standard imports
+import asyncio
+import concurrent.futures
+import pytest
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class aio_tester:
+
+    def load_test(self):
+        c = _run(load(make_data_filename('ordering-test.yaml')))
+
+        assert list(c.keys()) == ['zero', 'uno', 'dua', 'tiga', 'chetyre']
+
+
+    def load_error_test(self):
+        with pytest.raises(ValueError):
+            _run(load(make_data_filename('not-a-dict.yaml')))
+
+
+    def load_many_test(self):
+        filenames = [make_data_filename('ordering-test.yaml'), make_data_filename('empty.yaml')]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            ordering, empty = _run(load_many(filenames, executor, lazy_depth=1))
+
+        assert ordering['tiga'] == 3
+        assert len(empty) == 0
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for binary module '''
+
+# Project specific imports
+from ycfg.binary import compile_config, mapped_config, open_compiled
+
+# Standard imports
+import datetime
+import os
+import pathlib
+import pytest
+
+
+_SAMPLE = '''
+lang.english:
+  counting:
+    one: 1
+    two: 2
+lang.bahasa.counting:
+  satu: 1
+  dua: 2
+list:
+  - {name: first}
+  - {name: second}
+date: 2018-04-16
+'''
+
+
+def _write(filename, text):
+    with filename.open('w') as f:
+        f.write(text)
+
+
+class mapped_config_tester:
+
+    def access_test(self, tmpdir):
+        work_dir = pathlib.Path(str(tmpdir))
+        _write(work_dir / 'sample.yaml', _SAMPLE)
+        compile_config(work_dir / 'sample.yaml', work_dir / 'sample.bin')
+
+        with mapped_config(work_dir / 'sample.bin') as c:
+            assert list(c) == ['lang', 'list', 'date']
+            assert c['lang.english.counting.one'] == 1
+            assert c.lang.bahasa.counting.dua == 2
+            assert c['list'] == [{'name': 'first'}, {'name': 'second'}]
+            assert c['date'] == datetime.date(2018, 4, 16)
+
+            counting = c['lang.bahasa.counting']
+            assert len(counting) == 2
+            assert sorted(counting.keys()) == ['dua', 'satu']
+            assert counting['satu'] == 1
+
+            assert 'lang.english.counting' in c
+            assert 'counting.two' in c['lang.english']
+            assert 'lang.russian' not in c
+
+            with pytest.raises(KeyError):
+                c['lang.russian']
+
+            with pytest.raises(TypeError):
+                c['lang.english.counting.one.not-existed']
+
+            with pytest.raises(AttributeError):
+                c.other
+
+
+    def not_compiled_test(self, tmpdir):
+        filename = pathlib.Path(str(tmpdir)) / 'sample.bin'
+        _write(filename, 'x' * 64)
+
+        with pytest.raises(ValueError):
+            mapped_config(filename)
+
+
+    def recompile_test(self, tmpdir):
+        source = pathlib.Path(str(tmpdir)) / 'sample.yaml'
+        _write(source, 'one: 1\n')
+
+        with open_compiled(source) as c:
+            assert c['one'] == 1
+
+        target = source.with_name('sample.yaml.bin')
+        assert target.exists()
+
+        # Up to date file is not compiled again
+        inode = target.stat().st_ino
+        os.utime(str(source), ns=(0, 0))
+        with open_compiled(source) as c:
+            assert c['one'] == 1
+        assert target.stat().st_ino == inode
+
+        _write(source, 'one: 2\n')
+        os.utime(str(target), ns=(0, 0))
+        with open_compiled(source) as c:
+            assert c['one'] == 2
+
+
+    def incompatible_test(self, tmpdir):
+        source = pathlib.Path(str(tmpdir)) / 'sample.yaml'
+        _write(source, 'one: 1\n')
+        target = source.with_name('sample.yaml.bin')
+        compile_config(source, target)
+
+        # Pretend the file was compiled by another Python version
+        content = bytearray(target.read_bytes())
+        content[12] = (content[12] + 1) % 256               # NOTE Marshal format version
+        target.write_bytes(bytes(content))
+        os.utime(str(source), ns=(0, 0))
+
+        with pytest.raises(ValueError) as ex:
+            mapped_config(target)
+        assert 'incompatible' in str(ex.value)
+
+        with open_compiled(source) as c:
+            assert c['one'] == 1
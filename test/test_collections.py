@@ -20,14 +20,22 @@
 # Project specific imports
 from context import make_data_filename
 from ycfg.collections import \
-    dict_stack  \
+    compact_node \
+  , compact_node_factory \
+  , diff \
+  , dict_stack  \
   , dict_and_value_node_factory \
   , folded_keys_dict \
+  , frozen_folded_keys_dict \
+  , key_path \
+  , merge \
   , ordered_dict_node_factory \
   , value_dict_pair
 
 # Standard imports
 import collections
+import gc
+import pickle
 import pytest
 
 
@@ -157,6 +165,52 @@ class folded_keys_dict_tester:
         assert 'dua' in d['lang']['bahasa']['counting']
 
 
+    def ctor_test_6(self):
+        # Later items override earlier ones
+        d = folded_keys_dict(collections.OrderedDict([
+            ('lang', {'english': {'one': 1, 'two': 2}})
+          , ('lang.english.one', 'uno')
+          , ('lang.bahasa.satu', 1)
+          ]))
+
+        assert d['lang.english.one'] == 'uno'
+        assert d['lang.english.two'] == 2
+        assert d['lang.bahasa.satu'] == 1
+
+        d = folded_keys_dict(collections.OrderedDict([
+            ('lang.english.one', 1)
+          , ('lang', {'bahasa.satu': 1})
+          , ('lang.english.two', 2)
+          ]))
+
+        assert d['lang.english.two'] == 2
+        assert d['lang.bahasa.satu'] == 1
+        assert 'lang.english.one' not in d
+
+
+    def deep_input_test(self):
+        data = {}
+        node = data
+        for i in range(5000):
+            node['level{}'.format(i)] = node = {}
+        node['leaf'] = 1
+
+        d = folded_keys_dict(data)
+
+        key = '.'.join('level{}'.format(i) for i in range(5000)) + '.leaf'
+        assert d[key] == 1
+
+
+    def intern_keys_test(self):
+        d = folded_keys_dict({''.join(['lang.', 'english.', 'counting.one']): 1})
+        e = folded_keys_dict({})
+        e[''.join(['lang.', 'english.', 'counting.one'])] = 1
+
+        key_d, = d['lang.english.counting'].keys()
+        key_e, = e['lang.english.counting'].keys()
+        assert key_d is key_e
+
+
     def access_test_1(self):
         d = folded_keys_dict(_TEST_DICT)
 
@@ -344,6 +398,484 @@ class folded_keys_dict_tester:
         assert d['lang.english.counting.one'] == 1
         assert d['lang.english.counting.two'] == 2
 
+        # Subtree w/ custom attributes is not reused
+        assert d['lang.english.counting'] is not e
+
+
+    def attributes_test(self):
+        d = folded_keys_dict(_TEST_DICT)
+
+        assert d.lang.english.counting.one == 1
+        assert getattr(d, 'lang.bahasa.counting.dua') == 2
+        # Attributes of the underlaid `data` are accessible as well
+        assert d.lang.english.counting.copy() == {'one': 1, 'two': 2}
+
+        with pytest.raises(AttributeError) as ex:
+            d.not_existed
+        assert str(ex.value) == "'folded_keys_dict' object has no attribute 'not_existed'"
+
+        with pytest.raises(TypeError):
+            getattr(d, 'lang.english.counting.one.not-existed')
+
+
+    def views_cache_test(self):
+        d = folded_keys_dict(_TEST_DICT)
+
+        # Same subtree is returned on repeated access
+        e = d['lang.english']
+        assert d['lang.english'] is e
+        assert d.lang.english is e
+        assert d['lang']['english'] is e
+        assert e['counting'] is d['lang.english.counting']
+
+        # Replaced subtree is not reused
+        d['lang.english'] = {'counting': {'one': 1}}
+        assert d['lang.english'] is not e
+        assert 'counting.two' in e
+        assert 'counting.two' not in d['lang.english']
+
+        # Views no one refers to are not kept by the cache
+        d['many'] = {'key{}'.format(i): {'value': i} for i in range(100)}
+        for i in range(100):
+            assert d['many.key{}'.format(i)].value == i
+        del e
+        gc.collect()
+        assert len(d._views) < 10
+
+
+class indexed_folded_keys_dict_tester:
+
+    def _check_index(self, d):
+        fresh = folded_keys_dict(d.data, indexed=True)
+        assert d._index == fresh._index
+
+
+    def access_test(self):
+        d = folded_keys_dict(_TEST_DICT, indexed=True)
+        self._check_index(d)
+
+        assert d['lang.english.counting.one'] == 1
+        assert d['lang']['bahasa.counting.dua'] == 2
+        assert d.lang.bahasa.counting.satu == 1
+        assert len(d['lang.bahasa.counting']) == 2
+
+        assert 'lang.english.counting' in d
+        assert 'counting.one' in d['lang.english']
+        assert 'lang.russian' not in d
+        assert 'lang.english.counting.one.not-existed' not in d
+
+        with pytest.raises(KeyError):
+            d['lang.not-exist']
+
+        with pytest.raises(TypeError):
+            d['lang.english.counting.one.not-existed']
+
+
+    def assign_test(self):
+        d = folded_keys_dict(_TEST_DICT, indexed=True)
+
+        d['lang.english.counting.three'] = 3
+        assert d['lang.english.counting.three'] == 3
+
+        # Assign via a subtree
+        l = d['lang']
+        l['russian.counting.raz'] = 1
+        assert d['lang.russian.counting.raz'] == 1
+        assert 'lang.russian.counting' in d
+
+        # Replace a subtree w/ a value
+        d['lang.bahasa'] = 'none'
+        assert d['lang.bahasa'] == 'none'
+        assert 'lang.bahasa.counting' not in d
+
+        self._check_index(d)
+
+
+    def delete_test(self):
+        d = folded_keys_dict(_TEST_DICT, indexed=True)
+
+        del d['lang.english.counting.one']
+        assert 'lang.english.counting.one' not in d
+
+        del d['lang']['bahasa']
+        assert 'lang.bahasa' not in d
+        assert 'lang.bahasa.counting.satu' not in d
+
+        self._check_index(d)
+
+
+    def replaced_subtree_test(self):
+        d = folded_keys_dict(_TEST_DICT, indexed=True)
+
+        sub = d['lang.english']
+        d['lang.english'] = 'none'
+        sub['counting.three'] = 3
+        assert sub['counting.three'] == 3
+        assert sub['counting.one'] == 1
+
+        assert 'lang.english.counting.three' not in d
+        assert d['lang.english'] == 'none'
+        self._check_index(d)
+
+        sub = d['lang.bahasa']
+        del d['lang']
+        del sub['counting.satu']
+        assert 'counting.dua' in sub
+        assert 'lang.bahasa.counting.dua' not in d
+        self._check_index(d)
+
+
+    def update_test(self):
+        d = folded_keys_dict(_TEST_DICT, indexed=True)
+        d.update(folded_keys_dict({'lang.russian.counting.raz': 1, 'other': 0}))
+
+        assert d['lang.russian.counting.raz'] == 1
+        assert 'lang.english' not in d
+        assert d['other'] == 0
+
+        self._check_index(d)
+
+
+class frozen_folded_keys_dict_tester:
+
+    def freeze_test(self):
+        d = folded_keys_dict(_TEST_DICT)
+        f = d.freeze()
+
+        assert isinstance(f, frozen_folded_keys_dict)
+        assert f == d
+        assert f['lang.english.counting.one'] == 1
+        assert f.lang.bahasa.counting.dua == 2
+        assert 'lang.bahasa.counting' in f
+        assert 'lang.russian' not in f
+
+        # Subtrees are not re-created per access
+        assert f['lang.english'] is f.lang.english
+
+        # Snapshot is not affected by changes in the source
+        d['lang.english.counting.one'] = 100
+        assert f['lang.english.counting.one'] == 1
+
+
+    def access_errors_test(self):
+        f = frozen_folded_keys_dict(_TEST_DICT)
+
+        with pytest.raises(KeyError):
+            f['lang.not-exist']
+
+        with pytest.raises(TypeError):
+            f['lang.english.counting.one.not-existed']
+
+        with pytest.raises(AttributeError):
+            f.lang.not_exist
+
+
+    def immutable_test(self):
+        f = frozen_folded_keys_dict({'one': [1, 2], 'two': {'three': 3}})
+
+        assert f['one'] == (1, 2)
+
+        with pytest.raises(TypeError):
+            f['one'] = 2
+
+        with pytest.raises(AttributeError):
+            f.one = 2
+
+        with pytest.raises(AttributeError):
+            f._data = {}
+
+
+    def eq_lists_test(self):
+        data = {'one': [1, {'two': 2}], 'three': {'four': {4}}}
+        d = folded_keys_dict(data)
+        f = d.freeze()
+
+        assert f == d
+        assert f == data
+        assert f == {'one': (1, {'two': 2}), 'three': {'four': frozenset([4])}}
+        assert f != {'one': [1, {'two': 3}], 'three': {'four': {4}}}
+
+
+    def hash_test(self):
+        f = frozen_folded_keys_dict(_TEST_DICT)
+        g = frozen_folded_keys_dict(_TEST_DICT)
+
+        assert f is not g
+        assert f == g
+        assert hash(f) == hash(g)
+        assert len({f, g}) == 1
+
+        assert f != g.set('lang.english.counting.one', 2)
+
+
+    def set_test(self):
+        f = frozen_folded_keys_dict(_TEST_DICT)
+        g = f.set('lang.english.counting.three', 3)
+
+        assert 'lang.english.counting.three' not in f
+        assert g['lang.english.counting.three'] == 3
+
+        # Unchanged subtrees are shared
+        assert g.lang.bahasa is f.lang.bahasa
+        assert g.lang.english is not f.lang.english
+
+        h = g.set('lang.russian', {'counting.raz': 1})
+        assert h['lang.russian.counting.raz'] == 1
+        assert h.lang.english is g.lang.english
+
+
+    def delete_test(self):
+        f = frozen_folded_keys_dict(_TEST_DICT)
+        g = f.delete('lang.english.counting.one')
+
+        assert 'lang.english.counting.one' in f
+        assert 'lang.english.counting.one' not in g
+        assert g.lang.bahasa is f.lang.bahasa
+
+        with pytest.raises(KeyError):
+            f.delete('lang.russian.counting')
+
+
+    def deep_tree_test(self):
+        key = '.'.join('level{}'.format(i) for i in range(3000))
+        d = folded_keys_dict()
+        d[key] = 'leaf'
+
+        f = d.freeze()
+        assert f[key] == 'leaf'
+        assert hash(f) == hash(d.freeze())
+        assert f == d.freeze()
+        assert f == d
+
+
+    def pickle_test(self):
+        f = frozen_folded_keys_dict(_TEST_DICT)
+        g = pickle.loads(pickle.dumps(f))
+
+        assert f == g
+        assert g.lang.english.counting.two == 2
+
+
+    def value_nodes_test(self):
+        p = value_dict_pair(data=collections.OrderedDict())
+        d = folded_keys_dict(p, node_factory=dict_and_value_node_factory(node_prototype=p))
+        d['lang.english.counting.one'] = 1
+        d['lang.english.counting.one.text'] = 'one'
+
+        f = d.freeze()
+        assert f.lang.english.counting.one.value == 1
+        assert f.lang.english.counting.one.text.value == 'one'
+
+
+    def value_nodes_list_test(self):
+        p = value_dict_pair(data=collections.OrderedDict())
+        d = folded_keys_dict(p, node_factory=dict_and_value_node_factory(node_prototype=p))
+        d['lang.english.counting'] = [1, 2]
+        d['lang.english.counting.one'] = 1
+
+        f = d.freeze()
+        assert f.lang.english.counting.value == (1, 2)
+        assert hash(f) == hash(d.freeze())
+        assert hash(merge(f, d)) == hash(f)
+
+
+class key_path_tester:
+
+    @pytest.mark.parametrize('indexed', [False, True])
+    def folded_keys_dict_test(self, indexed):
+        d = folded_keys_dict(_TEST_DICT, indexed=indexed)
+
+        one = key_path('lang.english.counting.one')
+        assert one(d) == 1
+        assert key_path('counting.one')(d['lang.english']) == 1
+
+        counting = key_path('lang.bahasa.counting')(d)
+        assert isinstance(counting, folded_keys_dict)
+        assert counting['dua'] == 2
+
+        with pytest.raises(KeyError):
+            key_path('lang.russian')(d)
+
+        with pytest.raises(TypeError):
+            key_path('lang.english.counting.one.not-existed')(d)
+
+        assert key_path('lang.russian').get(d) is None
+
+
+    def other_containers_test(self):
+        one = key_path('lang.english.counting.one')
+
+        assert one(folded_keys_dict(_TEST_DICT).freeze()) == 1
+        assert one(dict_stack(folded_keys_dict(_TEST_DICT))) == 1
+
+
+    @pytest.mark.parametrize('indexed', [False, True])
+    def get_many_test(self, indexed):
+        d = folded_keys_dict(_TEST_DICT, indexed=indexed)
+
+        paths = [
+            key_path('lang.english.counting.one')
+          , 'lang.english.counting.two'
+          , key_path('lang.bahasa.counting.satu')
+          , key_path('lang.bahasa')
+          , key_path('lang.russian.counting.raz')
+          , key_path('lang.english.counting.one.not-existed')
+          ]
+        one, two, satu, bahasa, raz = d.get_many(paths[:-1], default='missing')
+
+        assert (one, two, satu) == (1, 2, 1)
+        assert isinstance(bahasa, folded_keys_dict)
+        assert bahasa['counting.dua'] == 2
+        assert raz == 'missing'
+
+        with pytest.raises(KeyError):
+            d.get_many(paths[:-1])
+
+        with pytest.raises(TypeError):
+            d.get_many(paths[-1:])
+
+        # NOTE The `default` covers missing keys only, the same way as `key_path.get` does
+        with pytest.raises(TypeError):
+            d.get_many(paths[-1:], default='missing')
+        with pytest.raises(TypeError):
+            paths[-1].get(d, 'missing')
+
+
+    def dict_stack_get_many_test(self):
+        s = dict_stack(folded_keys_dict(_TEST_DICT), folded_keys_dict({'lang.english.counting.one': 'uno'}))
+
+        assert s.get_many([key_path('lang.english.counting.one'), 'lang.bahasa.counting.dua']) == ['uno', 2]
+        assert s.get_many(['lang.russian'], default=None) == [None]
+
+
+class merge_tester:
+
+    def merge_test(self):
+        shared = frozen_folded_keys_dict({'pool.size': 10})
+        first = folded_keys_dict({'db.host': 'localhost', 'db.port': 5432, 'db.pool': shared, 'log': {'level': 'info'}})
+        second = frozen_folded_keys_dict({'db.port': 6432, 'debug': True})
+        third = {'db.user': 'admin', 'log.level': 'debug'}
+
+        m = merge(first, second, third)
+
+        assert isinstance(m, frozen_folded_keys_dict)
+        assert m == {
+            'db': {'host': 'localhost', 'port': 6432, 'pool': {'pool': {'size': 10}}, 'user': 'admin'}
+          , 'log': {'level': 'debug'}
+          , 'debug': True
+          }
+        # Subtrees found in a single tree are shared
+        assert m['db.pool'] is shared
+        # Sources are not modified
+        assert first['db.port'] == 5432
+        assert 'user' not in first['db']
+
+
+    def empty_test(self):
+        assert merge() == {}
+        assert merge({'one': 1}) == {'one': 1}
+
+
+    @pytest.mark.parametrize(
+        'lists, expected'
+      , [
+            ('replace', (3, 1))
+          , ('append', (1, 2, 2, 3, 1))
+          , ('unique', (1, 2, 3))
+        ]
+      )
+    def lists_test(self, lists, expected):
+        m = merge({'a.list': [1, 2]}, {'a.list': [2]}, {'a.list': [3, 1]}, lists=lists)
+
+        assert m['a.list'] == expected
+
+
+    def lists_unhashable_test(self):
+        m = merge({'list': [{'one': 1}]}, {'list': [{'one': 1}, 2]}, lists='unique')
+
+        assert len(m['list']) == 2
+
+
+    def override_test(self):
+        # Value at a higher priority tree replaces a subtree and vice versa
+        assert merge({'a.b': 1}, {'a': 2}) == {'a': 2}
+        assert merge({'a': 2}, {'a.b': 1}) == {'a': {'b': 1}}
+        # Subtrees below an overriding value are not merged
+        assert merge({'a.c': 1}, {'a': 2}, {'a.b': 1}) == {'a': {'b': 1}}
+
+
+    @pytest.mark.parametrize(
+        'trees'
+      , [
+            ({'a.b': 1}, {'a': 2})
+          , ({'a': 2}, {'a.b': 1})
+          , ({'a.b': 1}, {'a.b': 2})
+        ]
+      )
+    def conflicts_test(self, trees):
+        with pytest.raises(ValueError) as ex:
+            merge(*trees, conflicts='error')
+
+        assert '`a' in str(ex.value)
+
+
+    def no_conflicts_test(self):
+        m = merge({'a.b': 1, 'a.l': [1]}, {'a.b': 1, 'a.l': [2]}, conflicts='error', lists='append')
+
+        assert m == {'a': {'b': 1, 'l': (1, 2)}}
+
+
+    def invalid_strategy_test(self):
+        with pytest.raises(ValueError):
+            merge({}, lists='merge')
+
+        with pytest.raises(ValueError):
+            merge({}, conflicts='ignore')
+
+
+class diff_tester:
+
+    def no_changes_test(self):
+        result = diff(folded_keys_dict(_TEST_DICT), folded_keys_dict(_TEST_DICT))
+
+        assert not result.added
+        assert not result.removed
+        assert not result.changed
+
+
+    def changes_test(self):
+        old = folded_keys_dict(_TEST_DICT)
+        new = folded_keys_dict(_TEST_DICT)
+        new['lang.english.counting.one'] = 'one'
+        new['lang.russian.counting.raz'] = 1
+        new['lang.bahasa.counting'] = 'none'
+        del new['lang.english.counting.two']
+
+        result = diff(old, new)
+
+        assert result.added == {'lang.russian'}
+        assert result.removed == {'lang.english.counting.two'}
+        assert result.changed == {'lang.english.counting.one', 'lang.bahasa.counting'}
+
+
+    def shared_subtrees_test(self):
+        class _guarded(dict):
+            def items(self):
+                raise AssertionError('Shared subtree has been walked')
+
+        old = frozen_folded_keys_dict({'one': 1, 'two': {'three': 3}})
+        old = old.set('big', frozen_folded_keys_dict._make(_guarded(four=4)))
+        new = old.set('one', 2)
+
+        assert diff(old, new).changed == {'one'}
+
+
+    def plain_mappings_test(self):
+        result = diff({'one': {'two': 2}, 3: 'three'}, frozen_folded_keys_dict({'one.two': 'dua'}))
+
+        assert result.removed == {'3'}
+        assert result.changed == {'one.two'}
+
 
 class folded_keys_ordered_dict_tester:
 
@@ -401,8 +933,66 @@ class folded_keys_value_dict_pair_tester:
         assert expected_out == stdout
 
 
+class compact_node_tester:
+
+    def assign_value_test(self):
+        n = compact_node()
+        assert n.value is None
+        assert not n
+        assert 'lang' not in n
+        assert n._children is None
+
+        n['lang'] = compact_node(1)
+
+        assert 'lang' in n
+        assert n['lang'].value == 1
+        assert n['lang']._children is None
+
+        with pytest.raises(AttributeError):
+            n.other = 1
+
+
+    def folded_keys_test(self):
+        d = folded_keys_dict(node_factory=compact_node_factory(intern_keys=True))
+        d['lang.english.counting.one'] = 1
+        d['lang.english.counting.two'] = 2
+        d['lang.bahasa.counting.dua'] = 2
+
+        assert d['lang.english.counting.one'].value == 1
+        assert d.lang.bahasa.counting.dua.value == 2
+
+        d['lang.english.counting.one.text'] = 'one'
+        assert d.lang.english.counting.one.value == 1
+        assert d.lang.english.counting.one.text.value == 'one'
+
+        del d['lang.english.counting.one']
+        assert 'lang.english.counting.one' not in d
+
+        f = d.freeze()
+        assert f.lang.english.counting.two.value == 2
+
+
 class dict_stack_tester:
 
+    def merged_test(self):
+        d = folded_keys_dict(_TEST_DICT)
+        e = folded_keys_dict({'lang.russian.counting.raz': 1, 'lang.english.counting.one': 'one'})
+        s = dict_stack(d, e, writable_layer={'other': 0})
+
+        m = s.merged()
+        assert isinstance(m, folded_keys_dict)
+        assert m['lang.english.counting.one'] == 'one'
+        assert m['lang.english.counting.two'] == 2
+        assert m['lang.russian.counting.raz'] == 1
+        assert m['other'] == 0
+        assert 'lang.english.counting' in m._index
+
+        # Merged view is a snapshot
+        s['other'] = 1
+        assert m['other'] == 0
+        assert d['lang.english.counting.one'] == 1
+
+
     def access_test_1(self):
         s = dict_stack({'one': 1}, {'two': 2, 'three': 3})
 
@@ -443,6 +1033,98 @@ class dict_stack_tester:
 
         assert 'one' in s
 
+
+    def priority_test(self):
+        d = folded_keys_dict({'lang.english.counting.one': 1, 'lang.english.counting.two': 2})
+        e = folded_keys_dict({'lang.english.counting.one': 'uno'})
+
+        s = dict_stack(d, e)
+
+        assert s['lang.english.counting.one'] == 'uno'
+        assert s['lang.english.counting'] == {'one': 'uno', 'two': 2}
+
+        # Layers are not modified by merging
+        assert d['lang.english.counting.one'] == 1
+        assert len(e['lang.english.counting']) == 1
+
+
+    def read_only_test(self):
+        d = folded_keys_dict(_TEST_DICT)
+        s = dict_stack(d)
+
+        with pytest.raises(TypeError):
+            s['lang.english']['counting.three'] = 3
+
+        assert 'lang.english.counting.three' not in d
+
+
+    def cache_test(self):
+        d = folded_keys_dict(_TEST_DICT)
+        s = dict_stack(d, writable_layer=folded_keys_dict())
+
+        l = s['lang']
+        assert s['lang'] is l
+        assert 'lang.russian' not in s
+
+        s['lang.russian.counting.raz'] = 1
+        assert s['lang'] is not l
+        assert s['lang.russian.counting.raz'] == 1
+
+        # Direct changes of layers require explicit invalidation
+        assert len(s['lang.english.counting']) == 2
+        d['lang.english.counting.three'] = 3
+        assert len(s['lang.english.counting']) == 2
+        s.invalidate_cache()
+        assert len(s['lang.english.counting']) == 3
+
+
+    def conflict_test(self):
+        s = dict_stack(folded_keys_dict({'one': 1}), folded_keys_dict({'one.two': 2}))
+
+        assert s['one.two'] == 2
+
+        s = dict_stack(folded_keys_dict({'one.two': 2}), folded_keys_dict({'one': 1}))
+
+        assert s['one'] == 1
+
+        # The highest layer wins, the same way as for the merged view
+        s = dict_stack(folded_keys_dict({'one': 1}), folded_keys_dict({'one.two': 2}))
+
+        assert s['one'] == {'two': 2}
+        assert s.merged()['one'] == {'two': 2}
+
+        s = dict_stack(folded_keys_dict({'one': 1}), folded_keys_dict({'one.two': 2}), folded_keys_dict({'one.three': 3}))
+
+        assert s['one'] == {'two': 2, 'three': 3}
+        assert s.merged()['one'] == {'two': 2, 'three': 3}
+
+
+    def merged_sets_test(self):
+        s = dict_stack({'set': {(1, 2), 'three'}}, {'other': 0})
+
+        m = s.merged()
+        assert m['set'] == {(1, 2), 'three'}
+        assert type(m['set']) is set
+
+
+    def misses_not_cached_test(self):
+        s = dict_stack(folded_keys_dict({'one': 1}))
+
+        for i in range(100):
+            assert 'key{}'.format(i) not in s
+            assert s.get('other{}'.format(i)) is None
+
+        assert s['one'] == 1
+        assert len(s._cache) == 1
+
+
+    def iterate_test(self):
+        s = dict_stack({'one': 1, 'two': 2}, {'two': 'dua', 'three': 3})
+
+        assert len(s) == 3
+        assert sorted(s) == ['one', 'three', 'two']
+        assert s['two'] == 'dua'
+
     #def assign_test_2(self, capfd, expected_out):
         #p = value_dict_pair(data=collections.OrderedDict())
         #d = folded_keys_dict(p, node_factory=dict_and_value_node_factory(node_prototype=p))
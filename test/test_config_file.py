@@ -19,9 +19,12 @@
 
 # Project specific imports
 from context import make_data_filename
-from ycfg.config_file import config, items_as_attributes
+from ycfg.cache import parsed_config_cache
+from ycfg.config_file import config, items_as_attributes, load_all
 
 # Standard imports
+import gc
+import pathlib
 import pytest
 
 
@@ -53,6 +56,130 @@ class config_file_tester:
         assert expected_out == stdout
 
 
+class load_all_tester:
+
+    def load_test(self):
+        documents = load_all(make_data_filename('multi-document.yaml'))
+
+        first = next(documents)
+        assert isinstance(first, config)
+        assert list(first.keys()) == ['name', 'value']
+        assert first['name'] == 'first'
+
+        second, empty = list(documents)
+        assert second['value'] == 2
+        assert len(empty) == 0
+
+
+    def not_a_dict_file_test(self):
+        with pytest.raises(ValueError):
+            list(load_all(make_data_filename('not-a-dict.yaml')))
+
+
+class lazy_config_tester:
+
+    def load_test(self):
+        c = config(make_data_filename('ordering-test.yaml'), lazy_depth=1)
+
+        assert list(c.keys()) == ['zero', 'uno', 'dua', 'tiga', 'chetyre']
+        assert c['tiga'] == 3
+
+
+    def not_a_dict_file_test(self):
+        with pytest.raises(ValueError):
+            config(make_data_filename('not-a-dict.yaml'), lazy_depth=1)
+
+
+class cached_config_tester:
+
+    def _write(self, filename, text):
+        with filename.open('w') as f:
+            f.write(text)
+
+
+    def unwritable_cache_test(self, tmpdir):
+        work_dir = pathlib.Path(str(tmpdir))
+        filename = work_dir / 'sample.yaml'
+        self._write(filename, 'one: 1\n')
+        # NOTE A regular file in place of a directory, so it fails even for root
+        self._write(work_dir / 'not-a-dir', '')
+        cache = parsed_config_cache(work_dir / 'not-a-dir' / 'cache')
+
+        assert config(filename, cache=cache)['one'] == 1
+        assert config(filename, cache=cache)['one'] == 1
+
+
+    def include_changed_test(self, tmpdir):
+        work_dir = pathlib.Path(str(tmpdir))
+        cache = parsed_config_cache(work_dir / 'cache')
+        filename = work_dir / 'sample.yaml'
+        self._write(filename, 'db: !include db.yaml\n')
+        self._write(work_dir / 'db.yaml', 'port: 1\n')
+
+        assert config(filename, cache=cache)['db']['port'] == 1
+        assert config(filename, cache=cache)['db']['port'] == 1
+
+        # Changed fragment turns the cache entry stale
+        self._write(work_dir / 'db.yaml', 'port: 22\n')
+        assert config(filename, cache=cache)['db']['port'] == 22
+
+
+    def warm_load_test(self, tmpdir, monkeypatch):
+        work_dir = pathlib.Path(str(tmpdir))
+        cache = parsed_config_cache(work_dir / 'cache')
+        filename = work_dir / 'sample.yaml'
+        self._write(filename, 'one: 1\ntwo: 2\n')
+
+        c = config(filename, cache=cache)
+        assert c['one'] == 1
+        assert len(list((work_dir / 'cache').iterdir())) == 1
+
+        def _must_not_be_called(*args, **kwargs):
+            raise AssertionError('YAML parsed again')
+
+        monkeypatch.setattr('ycfg.config_file.yaml.load', _must_not_be_called)
+
+        c = config(filename, cache=cache)
+        assert list(c.keys()) == ['one', 'two']
+
+
+    def stale_entry_test(self, tmpdir):
+        work_dir = pathlib.Path(str(tmpdir))
+        cache = parsed_config_cache(work_dir / 'cache')
+        filename = work_dir / 'sample.yaml'
+
+        self._write(filename, 'one: 1\n')
+        assert config(filename, cache=cache)['one'] == 1
+
+        self._write(filename, 'one: 2\n')
+        assert config(filename, cache=cache)['one'] == 2
+
+        # Previous entry has been replaced
+        assert len(list((work_dir / 'cache').iterdir())) == 1
+
+
+    def eviction_test(self, tmpdir):
+        work_dir = pathlib.Path(str(tmpdir))
+        cache = parsed_config_cache(work_dir / 'cache', max_entries=2)
+
+        for i in range(4):
+            filename = work_dir / 'sample-{}.yaml'.format(i)
+            self._write(filename, 'number: {}\n'.format(i))
+            config(filename, cache=cache)
+
+        assert len(list((work_dir / 'cache').iterdir())) == 2
+
+
+    def disabled_test(self, tmpdir):
+        work_dir = pathlib.Path(str(tmpdir))
+        cache = parsed_config_cache(work_dir / 'cache', enabled=False)
+        filename = work_dir / 'sample.yaml'
+        self._write(filename, 'one: 1\n')
+
+        assert config(filename, cache=cache)['one'] == 1
+        assert not (work_dir / 'cache').exists()
+
+
 class tricky_dict_tester:
 
     def empty_dict_test(self):
@@ -93,3 +220,27 @@ class tricky_dict_tester:
         assert d.bahasa.satu == 1
         assert d.bahasa.dua == 2
         assert d.bahasa.tiga == 3
+
+
+    def views_cache_test(self):
+        data = {'english': {'one': 1}, 'bahasa': {'satu': 1}}
+        d = items_as_attributes(data)
+
+        e = d.english
+        assert d.english is e
+        assert d.bahasa is not e
+
+        # Replaced item is not reused
+        data['english'] = {'one': 2}
+        assert d.english is not e
+        assert d.english.one == 2
+
+        # Wrapper w/ custom attributes is not reused
+        e = d.english
+        e.custom = 1
+        assert d.english is not e
+
+        # Wrappers no one refers to are not kept by the cache
+        del e
+        gc.collect()
+        assert not d._views
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for directory module '''
+
+# Project specific imports
+from context import make_data_filename
+from ycfg.collections import dict_stack, frozen_folded_keys_dict
+from ycfg.directory import load_directory
+
+# Standard imports
+import pathlib
+import pytest
+
+
+class load_directory_tester:
+
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def stack_test(self, max_workers):
+        s = load_directory(make_data_filename('conf.d'), max_workers=max_workers)
+
+        assert isinstance(s, dict_stack)
+        assert s['db.host'] == 'db.example.com'
+        assert s['db.port'] == 5432
+        assert s['logging.level'] == 'debug'
+        assert s['logging.handlers'] == ['console']
+        assert 'ignored' not in s
+
+
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def merge_test(self, max_workers):
+        d = load_directory(make_data_filename('conf.d'), max_workers=max_workers, merge=True)
+
+        assert isinstance(d, frozen_folded_keys_dict)
+        assert d == {
+            'db': {'host': 'db.example.com', 'port': 5432}
+          , 'logging': {'level': 'debug', 'handlers': ['console']}
+          }
+
+
+    def empty_test(self, tmpdir):
+        assert len(load_directory(pathlib.Path(str(tmpdir)), merge=True)) == 0
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for instrumentation hooks '''
+
+# Project specific imports
+from context import make_data_filename
+from ycfg import instrumentation
+from ycfg.collections import dict_stack, folded_keys_dict, key_path
+from ycfg.config_file import config
+from ycfg.yaml import _ordered_dict_constructor, ordered_dict_loader
+
+# Standard imports
+import json
+import pytest
+import yaml
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+class instrumentation_tester:
+
+    def phases_test(self, enabled):
+        c = config(make_data_filename('ordering-test.yaml'))
+        folded_keys_dict(c.data)
+        yaml.load('one: 1', ordered_dict_loader)
+
+        phases = instrumentation.dump()['phases']
+        assert phases['read']['calls'] == 1
+        assert phases['compose']['calls'] == 2
+        assert phases['construct']['calls'] == 2
+        assert phases['straighten']['calls'] == 1
+        assert all(stats['seconds'] >= 0 for stats in phases.values())
+
+
+    def access_test(self, enabled):
+        d = folded_keys_dict({'lang.english.one': 1, 'lang.english.two': 2})
+        d['lang.english.one']
+        d.lang.english.one
+        assert 'lang.english.two' in d
+        d.get_many(['lang.english.one', key_path('lang.english.two')])
+        key_path('lang.english.one')(d)
+
+        s = dict_stack(d, folded_keys_dict({'other': 0}))
+        s['other']
+        s['other']
+        assert 'lang' in s
+        assert 'zz' not in s
+        key_path('other')(s)
+
+        access = instrumentation.dump()['access']
+        assert access == {
+            'folded_keys_dict': {
+                'get': {'lang.english.one': 4, 'lang': 1, 'lang.english': 1, 'lang.english.two': 1}
+              , 'contains': {'lang.english.two': 1}
+              }
+          , 'dict_stack': {
+                'get': {'other': 3}
+              , 'contains': {'lang': 1, 'zz': 1}
+              }
+          }
+
+
+    def dump_json_test(self, enabled):
+        folded_keys_dict({'one': 1})['one']
+
+        data = json.loads(instrumentation.dump_json())
+        assert data['access']['folded_keys_dict']['get'] == {'one': 1}
+
+
+    def disable_test(self):
+        getitem = folded_keys_dict.__getitem__
+        contains = dict_stack.__contains__
+
+        instrumentation.enable()
+        instrumentation.enable()
+        assert instrumentation.is_enabled()
+        assert folded_keys_dict.__getitem__ is not getitem
+
+        instrumentation.disable()
+        assert not instrumentation.is_enabled()
+        assert folded_keys_dict.__getitem__ is getitem
+        assert dict_stack.__contains__ is contains
+        assert 'get_single_node' not in vars(_ordered_dict_constructor)
+
+        instrumentation.reset()
+        folded_keys_dict({'one': 1})['one']
+        assert instrumentation.dump() == {'phases': {}, 'access': {}}
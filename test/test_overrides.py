@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for environment and command line overrides '''
+
+# Project specific imports
+from ycfg.collections import folded_keys_dict
+from ycfg.overrides import from_argv, from_environ, with_overrides
+
+# Standard imports
+import pytest
+
+
+class overrides_tester:
+
+    def from_environ_test(self):
+        environ = {
+            'APP__DB__HOST': 'remote'
+          , 'APP__DB__PORT': '6432'
+          , 'APP__LOG__MAX_SIZE': '1k'
+          , 'APP__': 'ignored'
+          , 'OTHER__DB__HOST': 'ignored'
+          }
+        d = from_environ('APP', environ)
+
+        assert isinstance(d, folded_keys_dict)
+        assert d['db.host'] == 'remote'
+        assert d['db.port'] == 6432
+        assert d['log.max_size'] == '1k'
+        assert len(d) == 2
+
+
+    def from_argv_test(self):
+        d = from_argv(['prog', '-v', '--set', 'a.b.c=x', '--set=debug=true', '--set', 'a.list=[1, 2]', '--set', 'a.e='])
+
+        assert d['a.b.c'] == 'x'
+        assert d['debug'] is True
+        assert d['a.list'] == [1, 2]
+        assert d['a.e'] == ''
+
+
+    @pytest.mark.parametrize(
+        'text, expected'
+      , [
+            ('hello: world', 'hello: world')
+          , ('- a', '- a')
+          , ('[1, 2]', [1, 2])
+          , ('{a: 1}', {'a': 1})
+          , ('0755', '0755')
+          , ('1:30', '1:30')
+          , ('0x1f', 31)
+          , ('-12', -12)
+          , ('1.5', 1.5)
+          , ('NO', 'NO')
+          , ('yes', 'yes')
+          , ('off', 'off')
+          , ('false', False)
+          , ('True', True)
+          , ('null', None)
+        ]
+      )
+    def parse_value_test(self, text, expected):
+        d = from_argv(['--set', 'value=' + text])
+        assert d['value'] == expected
+        if not isinstance(expected, dict):
+            assert type(d['value']) is type(expected)
+
+        d = from_environ('APP', {'APP__VALUE': text})
+        assert d['value'] == expected
+
+
+    @pytest.mark.parametrize('argv', [['--set'], ['--set', 'a.b'], ['--set==x']])
+    def from_argv_error_test(self, argv):
+        with pytest.raises(ValueError):
+            from_argv(argv)
+
+
+    def with_overrides_test(self):
+        base = folded_keys_dict({
+            'db.host': 'localhost'
+          , 'db.port': 5432
+          , 'db.pools': [{'name': 'main', 'size': 10}]
+          , 'debug': False
+          , 'tags': ['a', 'b']
+          })
+        site = {'db.user': 'admin'}
+
+        m = with_overrides(
+            base
+          , site
+          , env_prefix='APP'
+          , environ={'APP__DB__PORT': '6432', 'APP__DB__HOST': 'env'}
+          , argv=['--set', 'db.host=cli', '--set', 'debug=true']
+          )
+
+        assert m['db.host'] == 'cli'
+        assert m['db.port'] == 6432
+        assert m['db.user'] == 'admin'
+        assert m['debug'] is True
+        assert m.db.port == 6432
+        # Values keep own types
+        assert m['tags'] == ['a', 'b']
+        assert isinstance(m['db.pools'], list)
+        assert m['db.pools'][0] == {'name': 'main', 'size': 10}
+        assert type(m['db.pools'][0]) is dict
+        assert m._index is not None
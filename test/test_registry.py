@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for registry module '''
+
+# Project specific imports
+from context import make_data_filename
+from ycfg.collections import folded_keys_dict, frozen_folded_keys_dict
+from ycfg.registry import config_registry, packed_config
+
+# Standard imports
+import os
+import pathlib
+import pickle
+import pytest
+
+
+_TEST_DICT = {
+    'lang.english.counting': {'one': 1, 'two': 2}
+  , 'lang.bahasa.counting': {'satu': 1, 'dua': 2}
+  , 'name': 'languages'
+  }
+
+
+class packed_config_tester:
+
+    def access_test(self):
+        p = packed_config(folded_keys_dict(_TEST_DICT))
+
+        assert len(p) == 2
+        assert list(p.keys()) == ['lang', 'name']
+        assert not p._decoded
+
+        assert p['name'] == 'languages'
+        assert p['lang.english.counting.one'] == 1
+        assert p.lang.bahasa.counting.dua == 2
+        assert isinstance(p['lang'], frozen_folded_keys_dict)
+        assert p['lang'] is p['lang']
+
+        assert 'lang.english.counting' in p
+        assert 'lang.russian' not in p
+        assert 'other' not in p
+
+        with pytest.raises(KeyError):
+            p['other']
+
+        with pytest.raises(AttributeError):
+            p.other
+
+
+    def dotted_key_under_value_test(self):
+        p = packed_config(folded_keys_dict({'name': 'languages', 'tags': ['a', 'b']}))
+
+        assert 'name.ang' not in p
+        assert 'tags.a' not in p
+
+        with pytest.raises(TypeError) as ex:
+            p['name.ang']
+        assert 'Key not indexable: `ang`' in str(ex.value)
+
+        with pytest.raises(TypeError):
+            p['tags.a']
+
+
+    def lazy_decoding_test(self):
+        p = packed_config(folded_keys_dict(_TEST_DICT))
+
+        assert p['name'] == 'languages'
+        assert list(p._decoded.keys()) == ['name']
+
+
+class config_registry_tester:
+
+    def load_test(self):
+        r = config_registry()
+        c = r.load('ordering', make_data_filename('ordering-test.yaml'))
+
+        assert 'ordering' in r
+        assert r['ordering'] is c
+        assert c['tiga'] == 3
+
+
+    def dotted_keys_test(self, tmpdir):
+        filename = pathlib.Path(str(tmpdir)) / 'sample.yaml'
+        filename.write_text('db.host: localhost\ndb: {port: 5432}\nlang.english.one: 1\n')
+
+        c = config_registry().load('sample', filename)
+
+        assert sorted(c.keys()) == ['db', 'lang']
+        assert 'db.port' in c
+        assert c['lang.english.one'] == 1
+        assert c.lang.english.one == 1
+
+
+    def seal_test(self):
+        r = config_registry()
+        r.add('sample', folded_keys_dict(_TEST_DICT))
+        r.seal()
+
+        with pytest.raises(RuntimeError):
+            r.add('other', {})
+
+        assert r['sample']['lang.english.counting.two'] == 2
+
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='`fork()` is not available')
+    def fork_test(self):
+        r = config_registry()
+        r.add('sample', folded_keys_dict(_TEST_DICT))
+        r.seal()
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.write(write_fd, pickle.dumps(r['sample']['lang.bahasa.counting.dua']))
+            os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as f:
+            assert pickle.loads(f.read()) == 2
+        os.waitpid(pid, 0)
+
+        # Nothing was decoded in the parent
+        assert not r['sample']._decoded
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for typed configuration schemas '''
+
+# Project specific imports
+from ycfg.collections import folded_keys_dict
+from ycfg.config_file import config
+from ycfg.schema import field, record, schema, schema_error
+
+# Standard imports
+import pathlib
+import pytest
+
+
+_DB = schema('db', host=str, port=field(int, 5432))
+_APP = schema('app', db=_DB, debug=field(bool, False), workers=field(int, 1), tags=field(list, ()))
+
+
+class schema_tester:
+
+    def load_test(self):
+        cfg = _APP.load({'db.host': 'localhost', 'db.port': '6432', 'debug': True})
+
+        assert isinstance(cfg, record)
+        assert cfg.db.host == 'localhost'
+        assert cfg.db.port == 6432
+        assert cfg.debug is True
+        assert cfg.workers == 1
+
+        assert cfg == _APP.load(folded_keys_dict({'db': {'host': 'localhost', 'port': 6432}, 'debug': True}))
+        assert cfg.as_dict() == {'db': {'host': 'localhost', 'port': 6432}, 'debug': True, 'workers': 1, 'tags': []}
+
+
+    def record_type_test(self):
+        cfg = _APP.load({'db.host': 'localhost'})
+
+        assert type(cfg) is _APP.record_type
+        assert type(cfg.db) is _DB.record_type
+        assert type(_APP.load({'db.host': 'other'})) is type(cfg)
+        assert sorted(_DB.record_type.__slots__) == ['host', 'port']
+
+        with pytest.raises(AttributeError):
+            cfg.not_existed = 1
+
+
+    def config_file_test(self, tmpdir):
+        filename = pathlib.Path(str(tmpdir)) / 'app.yaml'
+        filename.write_text('db.host: localhost\ndb.port: 1234\nworkers: 4\n')
+
+        cfg = _APP.load(config(filename))
+        assert cfg.db.host == 'localhost'
+        assert cfg.db.port == 1234
+        assert cfg.workers == 4
+
+
+    @pytest.mark.parametrize(
+        'data, path'
+      , [
+            ({}, 'db.host')
+          , ({'db.host': 'localhost', 'db.port': 'http'}, 'db.port')
+          , ({'db.host': 'localhost', 'debug': 'yes'}, 'debug')
+          , ({'db.host': 'localhost', 'db.user': 'root'}, 'db.user')
+          , ({'db': 'localhost'}, 'db')
+          , ({'db.host': None}, 'db.host')
+          , ({'db.host': {'a': 1}}, 'db.host')
+          , ({'db.host': ['a']}, 'db.host')
+          , ({'db.host': 'localhost', 'db.port': 3.9}, 'db.port')
+          , ({'db.host': 'localhost', 'db.port': True}, 'db.port')
+          , ({'db.host': 'localhost', 'db.port': None}, 'db.port')
+          , ({'db.host': 'localhost', 'tags': 'a'}, 'tags')
+        ]
+      )
+    def error_test(self, data, path):
+        with pytest.raises(schema_error) as ex:
+            _APP.load(data)
+
+        assert isinstance(ex.value, ValueError)
+        assert ex.value.path == path
+        assert '`{}`'.format(path) in str(ex.value)
+
+
+    def conversion_test(self):
+        cfg = _APP.load({'db.host': 'localhost', 'db.port': 6432.0, 'workers': '4', 'tags': ('a', 'b')})
+
+        assert cfg.db.port == 6432
+        assert type(cfg.db.port) is int
+        assert cfg.workers == 4
+        assert cfg.tags == ['a', 'b']
+
+
+    def allow_extra_test(self):
+        s = schema('s', allow_extra=True, one=int)
+
+        assert s.load({'one': 1, 'two': 2}).one == 1
+
+
+    def invalid_schema_test(self):
+        with pytest.raises(ValueError):
+            schema('s', _hidden=int)
+
+
+    def same_name_test(self):
+        one = schema('s', value=int)
+        two = schema('s', value=int)
+
+        assert one.record_type is not two.record_type
+        assert one.load({'value': 1}) != two.load({'value': 1})
+
+
+    def default_copy_test(self):
+        s = schema('s', items=field(list, []))
+        one = s.load({})
+        two = s.load({})
+        one.items.append(1)
+
+        assert two.items == []
+
+
+    def invalid_default_test(self):
+        with pytest.raises(ValueError):
+            field(int, 'many')
+        assert field(int, 4.0).default == 4
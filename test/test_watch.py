@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for watch module '''
+
+# Project specific imports
+from ycfg.watch import reloadable_config
+
+# Standard imports
+import os
+import pathlib
+import pytest
+import sys
+import threading
+
+
+def _write(filename, text):
+    # Write a new file and rename it like the most editors do
+    tmp = filename.with_suffix('.tmp')
+    with tmp.open('w') as f:
+        f.write(text)
+    os.replace(str(tmp), str(filename))
+
+
+class reloadable_config_tester:
+
+    def reload_test(self, tmpdir):
+        filename = pathlib.Path(str(tmpdir)) / 'sample.yaml'
+        _write(filename, 'db:\n  host: localhost\n  port: 5432\nname: sample\n')
+
+        c = reloadable_config(filename)
+        assert c['db']['host'] == 'localhost'
+
+        changes = []
+        c.subscribe(lambda cfg, changed: changes.append(changed))
+
+        # Nothing has changed
+        assert not c.reload()
+
+        _write(filename, 'db:\n  host: remote\n  port: 5432\nname: sample\nnew: 1\n')
+        assert c.reload()
+        assert c['db']['host'] == 'remote'
+        assert changes == [{'db.host', 'new'}]
+
+
+    def broken_file_test(self, tmpdir):
+        filename = pathlib.Path(str(tmpdir)) / 'sample.yaml'
+        _write(filename, 'one: 1\n')
+
+        c = reloadable_config(filename)
+        _write(filename, '- one\n')
+
+        with pytest.raises(ValueError):
+            c.reload()
+
+        assert c['one'] == 1
+
+
+    @pytest.mark.parametrize(
+        'use_inotify'
+      , [False, pytest.param(True, marks=pytest.mark.skipif(not sys.platform.startswith('linux'), reason='Linux only'))]
+      )
+    def background_test(self, tmpdir, use_inotify):
+        filename = pathlib.Path(str(tmpdir)) / 'sample.yaml'
+        _write(filename, 'one: 1\n')
+
+        reloaded = threading.Event()
+        changes = []
+
+        def _on_change(cfg, changed):
+            changes.append(changed)
+            reloaded.set()
+
+        with reloadable_config(filename, interval=0.05, use_inotify=use_inotify) as c:
+            c.subscribe(_on_change)
+            _write(filename, 'one: 2\n')
+
+            assert reloaded.wait(5)
+            assert c['one'] == 2
+            assert changes == [{'one'}]
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Unit tests for yaml module '''
+
+# Project specific imports
+from context import make_data_filename
+from ycfg.yaml import clear_include_cache, default_loader, lazy_mapping, load_lazy, ordered_dict_loader
+
+# Standard imports
+import collections
+import pathlib
+import pytest
+import yaml
+
+
+_LOADERS = [ordered_dict_loader]
+if hasattr(yaml, 'CLoader'):
+    from ycfg.yaml import ordered_dict_c_loader
+    _LOADERS.append(ordered_dict_c_loader)
+
+
+class ordered_dict_loader_tester:
+
+    def default_loader_test(self):
+        if hasattr(yaml, 'CLoader'):
+            assert issubclass(default_loader, yaml.CLoader)
+        else:
+            assert default_loader is ordered_dict_loader
+
+
+    @pytest.mark.parametrize('loader', _LOADERS)
+    def ordering_test(self, loader):
+        with make_data_filename('ordering-test.yaml').open('r') as f:
+            data = yaml.load(f, loader)
+
+        assert isinstance(data, collections.OrderedDict)
+        assert list(data.keys()) == ['zero', 'uno', 'dua', 'tiga', 'chetyre']
+
+
+    @pytest.mark.parametrize('loader', _LOADERS)
+    def nested_test(self, loader):
+        data = yaml.load('one:\n  two:\n    three: 3\n', loader)
+
+        assert isinstance(data['one'], collections.OrderedDict)
+        assert isinstance(data['one']['two'], collections.OrderedDict)
+        assert data['one']['two']['three'] == 3
+
+
+    @pytest.mark.parametrize('loader', _LOADERS)
+    def unhashable_key_test(self, loader):
+        with pytest.raises(yaml.constructor.ConstructorError) as ex:
+            yaml.load('? [one, two]\n: value\n', loader)
+
+        assert 'found unacceptable key `unhashable type' in str(ex.value)
+
+
+_LAZY_DOCUMENT = '''
+db:
+  host: localhost
+  pool:
+    size: 10
+logging:
+  level: debug
+  handlers: &handlers [console, file]
+other:
+  handlers: *handlers
+'''
+
+
+class interning_tester:
+
+    @pytest.mark.parametrize('loader', _LOADERS)
+    def keys_test(self, loader):
+        first = yaml.load('some_long_key_name: {nested_key_name: some value}', loader)
+        second = yaml.load('some_long_key_name: {nested_key_name: some value}', loader)
+
+        first_key, = first.keys()
+        second_key, = second.keys()
+        assert first_key is second_key
+
+        first_nested, = first[first_key].keys()
+        second_nested, = second[second_key].keys()
+        assert first_nested is second_nested
+
+        # NOTE Values are not interned by default
+        assert first[first_key][first_nested] is not second[second_key][second_nested]
+
+
+    @pytest.mark.parametrize('loader', _LOADERS)
+    def values_test(self, loader):
+        class _interning_loader(loader):
+            intern_values = True
+
+        first = yaml.load('one: some long value', _interning_loader)
+        second = yaml.load('two: some long value', _interning_loader)
+
+        assert first['one'] is second['two']
+
+
+class lazy_loader_tester:
+
+    @pytest.mark.parametrize('loader', _LOADERS)
+    def load_test(self, loader):
+        data = load_lazy(_LAZY_DOCUMENT, loader)
+
+        assert isinstance(data, lazy_mapping)
+        assert list(data.keys()) == ['db', 'logging', 'other']
+        assert not data.is_constructed('db')
+
+        assert data['db']['pool']['size'] == 10
+        assert isinstance(data['db'], collections.OrderedDict)
+        assert data.is_constructed('db')
+        assert not data.is_constructed('logging')
+
+        assert data['other']['handlers'] == ['console', 'file']
+        assert data == yaml.load(_LAZY_DOCUMENT, loader)
+
+
+    def depth_test(self):
+        data = load_lazy(_LAZY_DOCUMENT, depth=2)
+
+        assert isinstance(data['db'], lazy_mapping)
+        assert not data['db'].is_constructed('pool')
+        assert data['db']['host'] == 'localhost'
+        assert data['db']['pool'] == {'size': 10}
+
+
+    def not_a_mapping_test(self):
+        assert load_lazy('') is None
+        assert load_lazy('- one\n- two\n') == ['one', 'two']
+
+
+    @pytest.mark.parametrize('loader', _LOADERS)
+    def unhashable_key_test(self, loader):
+        with pytest.raises(yaml.constructor.ConstructorError) as ex:
+            load_lazy('? [one, two]\n: value\n', loader)
+
+        assert 'found unacceptable key `unhashable type' in str(ex.value)
+
+
+@pytest.mark.parametrize('loader', _LOADERS)
+class include_tester:
+
+    def _load(self, filename, loader):
+        with filename.open('rb') as f:
+            return yaml.load(f, loader)
+
+
+    def include_test(self, loader):
+        clear_include_cache()
+        data = self._load(make_data_filename('include/main.yaml'), loader)
+
+        assert data['name'] == 'main'
+        assert data['db'] == {'host': 'localhost', 'port': 5432, 'pool': {'size': 10}}
+        assert data['logging'] == {'level': 'info'}
+        assert isinstance(data['db'], collections.OrderedDict)
+
+
+    def cache_test(self, loader, tmpdir):
+        clear_include_cache()
+        work_dir = pathlib.Path(str(tmpdir))
+        (work_dir / 'fragment.yaml').write_text('value: 1\n')
+        (work_dir / 'nested.yaml').write_text('fragment: !include fragment.yaml\n')
+        (work_dir / 'main.yaml').write_text('one: !include nested.yaml\ntwo: !include nested.yaml\n')
+
+        data = self._load(work_dir / 'main.yaml', loader)
+        assert data['one'] == data['two'] == {'fragment': {'value': 1}}
+        # Every include gets own copy of the fragment
+        assert data['one'] is not data['two']
+        data['one']['fragment']['value'] = 0
+        assert self._load(work_dir / 'main.yaml', loader)['two']['fragment']['value'] == 1
+
+        # Change of a nested fragment invalidates all including ones
+        (work_dir / 'fragment.yaml').write_text('value: 22\n')
+        assert self._load(work_dir / 'main.yaml', loader)['one']['fragment']['value'] == 22
+
+
+    @pytest.mark.parametrize('filename', ['include/cycle-a.yaml', 'include/self.yaml'])
+    def cycle_test(self, loader, filename):
+        with pytest.raises(yaml.constructor.ConstructorError) as ex:
+            self._load(make_data_filename(filename), loader)
+
+        assert 'found include cycle' in str(ex.value)
+
+
+    def missing_test(self, loader):
+        with pytest.raises(yaml.constructor.ConstructorError) as ex:
+            yaml.load('one: !include /not-existed.yaml\n', loader)
+
+        assert 'unable to read `/not-existed.yaml`' in str(ex.value)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Asyncio friendly configuration loading '''
+
+# Project specific imports
+from .config_file import config
+
+# Standard imports
+import asyncio
+import functools
+import pathlib
+
+
+async def load(filename: pathlib.Path, executor=None, **kwargs):
+    '''
+        Load a configuration file w/o blocking the event loop.
+
+        Reading and parsing is done by the given `executor` (the default
+        executor of the loop if not given). See `ycfg.config_file.config`
+        for `kwargs`.
+    '''
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, functools.partial(config, filename, **kwargs))
+
+
+async def load_many(filenames, executor=None, **kwargs):
+    '''
+        Load given configuration files concurrently.
+
+        Returns a list of configurations in the order of `filenames`.
+    '''
+    return await asyncio.gather(*[load(filename, executor, **kwargs) for filename in filenames])
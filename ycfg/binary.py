@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Project specific imports
+from .collections import folded_keys_dict
+from .config_file import config
+
+# Standard imports
+import collections
+import marshal
+import mmap
+import os
+import pathlib
+import pickle
+import struct
+import sys
+import tempfile
+
+
+_MAGIC = b'YCFGBIN\0'
+_VERSION = 2
+# Magic, format version, marshal format version, Python major and minor versions, index offset and size
+_HEADER = struct.Struct('<8sIIBBQQ')
+# NOTE The marshal format is Python version specific, so files are bound to the interpreter version
+_STAMP = (_MAGIC, _VERSION, marshal.version, sys.version_info[0], sys.version_info[1])
+
+# Codecs of values
+_MARSHAL = 0
+_PICKLE = 1
+
+# An index entry of a subtree is a tuple w/ this marker and keys of the subtree
+_NODE = -1
+
+
+def compile_config(source: pathlib.Path, target: pathlib.Path):
+    '''
+        Compile a YAML configuration file into the binary format.
+
+        Every leaf value is serialized separately. The index maps every
+        dotted key to its value location or (for subtrees) a list of
+        child keys. The file is written atomically.
+    '''
+    tree = folded_keys_dict(config(source).data)
+
+    values = bytearray()
+    index = {}
+
+    stack = [(tree.data, '')]
+    while stack:
+        node, prefix = stack.pop()
+        index[prefix[:-1]] = (_NODE, tuple(node.keys()))
+        for key, value in node.items():
+            full_key = prefix + key
+            if isinstance(value, tree.node_factory.node_type):
+                stack.append((value, full_key + '.'))
+                continue
+
+            try:
+                chunk, codec = marshal.dumps(value), _MARSHAL
+            except ValueError:
+                chunk, codec = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), _PICKLE
+
+            index[full_key] = (_HEADER.size + len(values), len(chunk), codec)
+            values += chunk
+
+    index_blob = marshal.dumps(index)
+
+    fd, tmp = tempfile.mkstemp(dir=str(target.parent), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(*(_STAMP + (_HEADER.size + len(values), len(index_blob)))))
+            f.write(values)
+            f.write(index_blob)
+        os.replace(tmp, str(target))
+
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+class mapped_config(collections.Mapping):
+    '''
+        Read-only configuration served from a compiled binary file.
+
+        The file is memory mapped and only the index gets decoded when
+        opened. Values are decoded right from the mapped memory when
+        requested. Subtrees are `mapped_config` views sharing the same
+        mapping. Lookups by dotted keys behave like `folded_keys_dict` ones.
+    '''
+
+    def __init__(self, filename: pathlib.Path):
+        with filename.open('rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size or _HEADER.unpack_from(self._mm)[0] != _MAGIC:
+            self._mm.close()
+            raise ValueError('Not a compiled configuration file: `{}`'.format(filename))
+
+        header = _HEADER.unpack_from(self._mm)
+        if header[:len(_STAMP)] != _STAMP:
+            self._mm.close()
+            raise ValueError(
+                'Compiled configuration file is incompatible w/ the current Python or format version: `{}`'
+                .format(filename)
+              )
+
+        index_offset, index_size = header[len(_STAMP):]
+
+        self._index = marshal.loads(self._mm[index_offset:index_offset + index_size])
+        self._prefix = ''
+
+
+    def _make_subtree(self, key):
+        result = mapped_config.__new__(mapped_config)
+        result._mm = self._mm
+        result._index = self._index
+        result._prefix = self._prefix + key + '.'
+        return result
+
+
+    def _decode(self, offset, size, codec):
+        loads = marshal.loads if codec == _MARSHAL else pickle.loads
+        with memoryview(self._mm) as buffer, buffer[offset:offset + size] as chunk:
+            return loads(chunk)
+
+
+    def __getitem__(self, key: str):
+        assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
+
+        entry = self._index.get(self._prefix + key)
+
+        if entry is None:
+            # Find out if some component of the key is a leaf
+            parts = key.split('.')
+            for i in range(1, len(parts)):
+                entry = self._index.get(self._prefix + '.'.join(parts[:i]))
+                if entry is not None and entry[0] != _NODE:
+                    raise TypeError('Key not indexable: `{}`'.format(parts[i]))
+
+            raise KeyError('Key not found: `{}`'.format(key))
+
+        if entry[0] == _NODE:
+            return self._make_subtree(key)
+
+        return self._decode(*entry)
+
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            raise AttributeError(key)
+
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError('`{}` object has no attribute `{}`'.format(type(self).__name__, key))
+
+
+    def __contains__(self, key: str):
+        assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
+
+        return self._prefix + key in self._index
+
+
+    def _children(self):
+        return self._index[self._prefix[:-1]][1]
+
+
+    def __iter__(self):
+        return iter(self._children())
+
+
+    def __len__(self):
+        return len(self._children())
+
+
+    def close(self):
+        self._mm.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _is_compatible(target):
+    with target.open('rb') as f:
+        header = f.read(_HEADER.size)
+    return len(header) == _HEADER.size and _HEADER.unpack(header)[:len(_STAMP)] == _STAMP
+
+
+def open_compiled(source: pathlib.Path, target: pathlib.Path=None):
+    '''
+        Open the compiled `target` file (``<source>.bin`` by default) of the
+        YAML `source` file. The `target` is (re)compiled if it doesn't exist,
+        older than the `source` or has been compiled by another Python version.
+
+        NOTE Only the `source` file itself is checked: changes of fragments
+        included via the ``!include`` tag don't make the `target` outdated.
+    '''
+    if target is None:
+        target = source.with_name(source.name + '.bin')
+
+    try:
+        outdated = target.stat().st_mtime_ns < source.stat().st_mtime_ns or not _is_compatible(target)
+    except FileNotFoundError:
+        outdated = True
+
+    if outdated:
+        compile_config(source, target)
+
+    return mapped_config(target)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Project specific imports
+from .yaml import includes_changed
+
+# Standard imports
+import hashlib
+import os
+import pathlib
+import pickle
+import tempfile
+
+
+class parsed_config_cache:
+    '''
+        Persistent cache of parsed configuration files.
+
+        Parsed data is pickled into the `cache_dir`. An entry is keyed by
+        the absolute path of a source file, its modification time, size
+        and a hash of its content, so any change to the source file
+        turns the entry stale.
+
+        Stamps of fragments included by a source file (see
+        `ycfg.yaml.collect_includes()`) are stored w/ the parsed data, so
+        the entry turns stale if any of them changes as well.
+
+        Only the most recently used `max_entries` files are kept in the
+        cache directory. Setting `enabled` to ``False`` turns the cache
+        into a no-op.
+    '''
+
+    _SUFFIX = '.pickle'
+
+    def __init__(self, cache_dir: pathlib.Path, max_entries=128, enabled=True):
+        assert max_entries > 0
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+
+    def _path_key(self, filename):
+        return hashlib.sha1(str(filename.resolve()).encode('UTF-8')).hexdigest()
+
+
+    def _entry_filename(self, filename, content):
+        st = filename.stat()
+        state = hashlib.sha256()
+        state.update('{}:{}:'.format(st.st_mtime_ns, st.st_size).encode('ascii'))
+        state.update(content)
+        return self.cache_dir / '{}-{}{}'.format(self._path_key(filename), state.hexdigest(), self._SUFFIX)
+
+
+    def _entries(self, path_key=None):
+        pattern = '{}-*{}'.format(path_key if path_key is not None else '*', self._SUFFIX)
+        return list(self.cache_dir.glob(pattern))
+
+
+    def load(self, filename: pathlib.Path, content: bytes, default=None):
+        '''
+            Get previously parsed data for the `filename` w/ the given `content`
+            or `default` if there is no valid cache entry.
+        '''
+        if not self.enabled:
+            return default
+
+        entry = self._entry_filename(filename, content)
+        try:
+            with entry.open('rb') as f:
+                includes, data = pickle.load(f)
+
+        except FileNotFoundError:
+            return default
+
+        except Exception:
+            # NOTE Broken entry is the same as missed one
+            return default
+
+        if includes and includes_changed(includes):
+            return default
+
+        # Mark the entry as recently used
+        try:
+            os.utime(str(entry))
+        except OSError:
+            pass
+
+        return data
+
+
+    def store(self, filename: pathlib.Path, content: bytes, data, includes=()):
+        '''
+            Store parsed data of the `filename` w/ the given `content` and
+            stamps of included fragments.
+        '''
+        if not self.enabled:
+            return
+
+        # NOTE The cache is optional, so failure to write an entry must not break loading
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            entry = self._entry_filename(filename, content)
+
+            # Write the entry atomically, so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=str(self.cache_dir), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((frozenset(includes), data), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, str(entry))
+
+            except Exception:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+
+        except OSError:
+            return
+
+        # Drop stale entries of the same source file
+        for stale in self._entries(self._path_key(filename)):
+            if stale != entry:
+                self._remove(stale)
+
+        self._evict()
+
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(entry)
+
+
+    def _evict(self):
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except OSError:
+                pass
+
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=lambda item: item[0])
+        for _, entry in entries[:len(entries) - self.max_entries]:
+            self._remove(entry)
+
+
+    def _remove(self, entry):
+        try:
+            entry.unlink()
+        except OSError:
+            pass
@@ -21,7 +21,11 @@
 import abc
 import collections
 import functools
+import itertools
 import pathlib
+import sys
+import types
+import weakref
 import yaml
 
 
@@ -151,11 +155,196 @@ class dict_and_value_node_factory(abstract_node_factory):
             node[key].value = value
 
 
+class compact_node(collections.Mapping):
+    '''
+        A compact tree node w/ an optional value.
+
+        Unlike `value_dict_pair` it has no instance dictionary, and
+        a dictionary of children gets allocated on first assignment.
+    '''
+
+    __slots__ = ('_children', 'value')
+
+    _NO_CHILDREN = types.MappingProxyType({})
+
+    def __init__(self, value=None, data=None):
+        self._children = data if data else None
+        self.value = value
+
+
+    @property
+    def data(self):
+        return self._children if self._children is not None else self._NO_CHILDREN
+
+
+    def __len__(self):
+        return len(self._children) if self._children is not None else 0
+
+
+    def __getitem__(self, key):
+        if self._children is None:
+            raise KeyError(key)
+        return self._children[key]
+
+
+    def __setitem__(self, key, value):
+        if self._children is None:
+            self._children = {}
+        self._children[key] = value
+
+
+    def __delitem__(self, key):
+        if self._children is None:
+            raise KeyError(key)
+        del self._children[key]
+
+
+    def __iter__(self):
+        return iter(self.data)
+
+
+    def __contains__(self, key):
+        return self._children is not None and key in self._children
+
+
+    def __eq__(self, other):
+        if isinstance(other, compact_node):
+            return self.value == other.value and self.data == other.data
+
+        if isinstance(other, collections.Mapping):
+            return self.data == dict(other.items())
+
+        return self.value == other
+
+
+    def __str__(self):
+        return '({}, {})'.format(str(self.value), str(dict(self.data)))
+
+
+    def __repr__(self):
+        return '({}, {})'.format(repr(self.value), repr(dict(self.data)))
+
+
+    def items(self):
+        return self.data.items()
+
+
+    def keys(self):
+        return self.data.keys()
+
+
+    def values(self):
+        return self.data.values()
+
+
+class compact_node_factory(abstract_node_factory):
+    '''
+        Make `compact_node` trees, optionally w/ interned key strings.
+    '''
+
+    def __init__(self, intern_keys=False):
+        self.intern_keys = intern_keys
+
+
+    @property
+    def node_type(self):
+        return compact_node
+
+
+    def assign_value(self, node, key, value):
+        if self.intern_keys:
+            key = sys.intern(key)
+
+        if isinstance(value, compact_node):
+            node[key] = value
+        else:
+            if key not in node:
+                node[key] = compact_node()
+            node[key].value = value
+
+
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=None)
+def _data_attributes(data_type):
+    '''
+        Get names of attributes of the given node type and whether its
+        instances may have own attributes.
+    '''
+    return frozenset(dir(data_type)), data_type.__dictoffset__ != 0
+
+
+class key_path:
+    '''
+        A dotted key compiled for repeated lookups.
+
+        The key gets split (and components interned) only once. Calling
+        the instance w/ a `folded_keys_dict`, `frozen_folded_keys_dict` or
+        `dict_stack` returns the value at the key.
+    '''
+
+    __slots__ = ('key', 'parts')
+
+    def __init__(self, key: str):
+        assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
+        self.key = key
+        self.parts = tuple(sys.intern(part) for part in key.split('.'))
+
+
+    def __call__(self, container):
+        if isinstance(container, (folded_keys_dict, frozen_folded_keys_dict)):
+            return container._lookup(self.key, self.parts)
+
+        return container[self.key]
+
+
+    def get(self, container, default=None):
+        try:
+            return self(container)
+        except KeyError:
+            return default
+
+
+    def __eq__(self, other):
+        return isinstance(other, key_path) and self.key == other.key
+
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+    def __repr__(self):
+        return 'key_path({!r})'.format(self.key)
+
+
 class folded_keys_dict(collections.Mapping):
+    '''
+        A dictionary w/ "folded" keys, i.e. ``d['a.b.c']`` is the same as ``d['a']['b']['c']``.
+
+        If `indexed` is ``True`` the instance maintains a flat index of all
+        full dotted paths to leaves and subtrees, so lookups and membership
+        tests become a single dictionary hit. The index is kept up to date
+        by `__setitem__`, `__delitem__` and `update` (also when called via
+        subtrees obtained from the indexed instance) but not when the
+        underlying `data` changed directly.
+
+        Subtrees returned by `__getitem__` and attribute access are cached
+        (weakly, so the cache doesn't grow w/ every subtree ever visited)
+        and shared by the whole tree, so repeated access to the same subtree
+        returns the same instance as long as the subtree node remains the same
+        and the instance is still alive.
+    '''
 
     __no_straighten = True
 
-    def __init__(self, data=None, node_factory=None, __calling_protected_ctor__=None):
+    _INTERNAL_ATTRIBUTES = frozenset(['data', 'node_factory', '_index', '_prefix', '_views', '_detached'])
+    _detached = False
+
+    def __init__(self, data=None, node_factory=None, indexed=False, __calling_protected_ctor__=None):
+        self._index = None
+        self._prefix = ''
+        self._views = weakref.WeakValueDictionary()
         self.node_factory = node_factory if node_factory is not None else dict_node_factory()
         if data is None:
             data = {}
@@ -164,6 +353,10 @@ class folded_keys_dict(collections.Mapping):
         else:
             self.data = self._straighten_dict(data)
 
+        if indexed:
+            self._index = {}
+            self._index_subtree(self.data, '')
+
 
     #BEGIN Reduce functors
     def _build_node(self, state, item):
@@ -197,39 +390,171 @@ class folded_keys_dict(collections.Mapping):
 
 
     def _straighten_dict(self, data):
-        result = self.node_factory.make_node()
+        '''
+            Build a tree from a (nested) dictionary w/ dotted keys.
 
-        for key, value in data.items():
-            assert isinstance(key, str)                     # NOTE For other type of keys this container have no sense
+            Nested dictionaries are processed w/ an explicit stack instead of
+            recursion, and a node for every dotted prefix gets cached per
+            source dictionary, so keys sharing long prefixes don't walk the
+            prefix path again.
 
-            parts = key.split('.')
+            Key components get interned, so trees of the same shape share
+            key strings.
+        '''
+        node_type = self.node_factory.node_type
+        make_node = self.node_factory.make_node
+        assign_value = self.node_factory.assign_value
 
-            if isinstance(value, self.node_factory.node_type):
-                value = self._straighten_dict(value)
+        result = make_node()
 
-            self.node_factory.assign_value(
-                functools.reduce(self._build_node, parts[:-1], result)
-              , parts[-1]
-              , value
-              )
+        stack = [(iter(data.items()), result, {})]
+        while stack:
+            items, target, parents = stack[-1]
+
+            for key, value in items:
+                assert isinstance(key, str)                 # NOTE For other type of keys this container have no sense
+
+                prefix, _, last = key.rpartition('.')
+                last = sys.intern(last)
+                if prefix:
+                    node = parents.get(prefix)
+                    if node is None:
+                        node = parents[prefix] = functools.reduce(self._build_node, map(sys.intern, prefix.split('.')), target)
+                else:
+                    node = target
+
+                # NOTE Overriding an existing item may detach cached nodes from the tree
+                if last in node:
+                    parents.clear()
+
+                if isinstance(value, node_type):
+                    child = make_node()
+                    assign_value(node, last, child)
+                    # Process the nested dictionary before the rest of items
+                    stack.append((iter(value.items()), child, {}))
+                    break
+
+                assign_value(node, last, value)
+
+            else:
+                stack.pop()
 
         return result
 
 
+    #BEGIN Flat index helpers
+    def _index_subtree(self, node, path):
+        prefix = path + '.' if path else ''
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            for key, value in node.items():
+                full_key = prefix + key
+                self._index[full_key] = value
+                if isinstance(value, self.node_factory.node_type):
+                    stack.append((value, full_key + '.'))
+
+
+    def _unindex(self, path):
+        old = self._index.pop(path, _MISSING)
+        if isinstance(old, self.node_factory.node_type):
+            stack = [(old, path + '.')]
+            while stack:
+                node, prefix = stack.pop()
+                for key, value in node.items():
+                    full_key = prefix + key
+                    self._index.pop(full_key, None)
+                    if isinstance(value, self.node_factory.node_type):
+                        stack.append((value, full_key + '.'))
+
+
+    def _reindex(self, key, node):
+        '''
+            Update the index after assignment to `key` of this (sub)tree.
+
+            The `node` is a parent node of the assigned value.
+        '''
+        parts = key.split('.')
+        # Intermediate nodes could be just created
+        path, current = self._prefix, self.data
+        for part in parts[:-1]:
+            current = current[part]
+            path += part
+            if path not in self._index:
+                self._index[path] = current
+            path += '.'
+
+        full_key = self._prefix + key
+        self._unindex(full_key)
+        value = node[parts[-1]]
+        self._index[full_key] = value
+        if isinstance(value, self.node_factory.node_type):
+            self._index_subtree(value, full_key)
+    #END Flat index helpers
+
+
+    def _attached_index(self):
+        '''
+            Get the shared index if this (sub)tree is still a part of the
+            indexed tree. A subtree which node has been replaced or removed
+            via the parent gets detached from the index.
+        '''
+        index = self._index
+        if index is not None and self._prefix and index.get(self._prefix[:-1]) is not self.data:
+            self._index = index = None
+        return index
+
+
+    def _make_subtree(self, node, key):
+        full_key = self._prefix + key
+
+        result = self._views.get(full_key)
+        if result is not None and result.data is node and not result._detached:
+            return result
+
+        result = folded_keys_dict(
+            node
+          , node_factory=self.node_factory
+          , __calling_protected_ctor__=folded_keys_dict.__no_straighten
+          )
+        # Subtrees share the same index and cache of views
+        result._index = self._index
+        result._prefix = full_key + '.'
+        result._views = self._views
+        self._views[full_key] = result
+        return result
+
+
+    def __setattr__(self, name, value):
+        # NOTE An instance w/ custom attributes must not be returned from the views cache
+        if name not in folded_keys_dict._INTERNAL_ATTRIBUTES:
+            object.__setattr__(self, '_detached', True)
+        object.__setattr__(self, name, value)
+
+
     def __getitem__(self, key: str):
         assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
 
-        parts = key.split('.')
+        return self._lookup(key)
+
+
+    def _lookup(self, key, parts=None):
+        if self._attached_index() is not None:
+            result = self._index.get(self._prefix + key, _MISSING)
+            if result is not _MISSING:
+                if isinstance(result, self.node_factory.node_type):
+                    return self._make_subtree(result, key)
+                return result
+            # NOTE Fall back to the regular lookup to raise a proper exception
+
+        if parts is None:
+            parts = key.split('.')
 
         try:
             result = functools.reduce(self._traverse_keys_path, parts, self.data)
 
             if isinstance(result, self.node_factory.node_type):
-                return folded_keys_dict(
-                    result
-                  , node_factory=self.node_factory
-                  , __calling_protected_ctor__=folded_keys_dict.__no_straighten
-                  )
+                return self._make_subtree(result, key)
 
             return result
 
@@ -243,12 +568,14 @@ class folded_keys_dict(collections.Mapping):
     def __setitem__(self, key, value):
         assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
 
-        parts = key.split('.')
-        self.node_factory.assign_value(
-            functools.reduce(self._build_node, parts[:-1], self.data)
-          , parts[-1]
-          , value
-          )
+        parts = [sys.intern(part) for part in key.split('.')]
+        node = functools.reduce(self._build_node, parts[:-1], self.data)
+        self.node_factory.assign_value(node, parts[-1], value)
+
+        if self._attached_index() is not None:
+            self._reindex(key, node)
+
+        self._views.clear()
 
 
     def __delitem__(self, key: str):
@@ -260,10 +587,18 @@ class folded_keys_dict(collections.Mapping):
         assert isinstance(node, self.node_factory.node_type)
         del node[parts[-1]]                                 # NOTE This may throw KeyError
 
+        if self._attached_index() is not None:
+            self._unindex(self._prefix + key)
+
+        self._views.clear()
+
 
     def __contains__(self, key: str):
         assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
 
+        if self._attached_index() is not None:
+            return self._prefix + key in self._index
+
         return functools.reduce(self._check_keys_path, key.split('.'), (self.data, True))[1]
 
 
@@ -287,103 +622,725 @@ class folded_keys_dict(collections.Mapping):
         return self.data.values()
 
 
+    def get_many(self, paths, default=_MISSING):
+        '''
+            Get values of all given keys (strings or `key_path` instances) at once.
+
+            Keys sharing a prefix walk it only once. Missing keys get the
+            `default` value if given, otherwise the same exception as
+            `__getitem__` would raise. Like `key_path.get`, the `default`
+            doesn't cover keys going through a scalar (`TypeError` is raised).
+        '''
+        paths = [path if isinstance(path, key_path) else key_path(path) for path in paths]
+        results = [_MISSING] * len(paths)
+
+        if self._attached_index() is not None:
+            for i, path in enumerate(paths):
+                results[i] = self._index.get(self._prefix + path.key, _MISSING)
+
+        else:
+            # Make a trie of key components: component -> (children, indices of paths ended here)
+            trie = {}
+            for i, path in enumerate(paths):
+                node = trie
+                for part in path.parts[:-1]:
+                    node = node.setdefault(part, ({}, []))[0]
+                node.setdefault(path.parts[-1], ({}, []))[1].append(i)
+
+            stack = [(trie, self.data)]
+            while stack:
+                trie_node, data = stack.pop()
+                for part, (children, ends) in trie_node.items():
+                    if part not in data:
+                        continue
+                    value = data[part]
+                    for i in ends:
+                        results[i] = value
+                    if children and isinstance(value, self.node_factory.node_type):
+                        stack.append((children, value))
+
+        for i, path in enumerate(paths):
+            if results[i] is _MISSING:
+                if default is _MISSING:
+                    results[i] = self._lookup(path.key, path.parts)
+                else:
+                    try:
+                        results[i] = self._lookup(path.key, path.parts)
+                    except KeyError:
+                        results[i] = default
+            elif isinstance(results[i], self.node_factory.node_type):
+                results[i] = self._make_subtree(results[i], path.key)
+
+        return results
+
+
     def update(self, other):
-        return self.data.update(other.data)
+        indexed = self._attached_index() is not None
+
+        result = self.data.update(other.data)
+        self._views.clear()
+
+        if indexed:
+            for key in other.data:
+                full_key = self._prefix + key
+                self._unindex(full_key)
+                value = self.data[key]
+                self._index[full_key] = value
+                if isinstance(value, self.node_factory.node_type):
+                    self._index_subtree(value, full_key)
+
+        return result
 
 
     def __getattr__(self, key):
         '''
             See also `ItemsAsAttributes <https://github.com/jaraco/jaraco.collections/blob/master/jaraco/collections.py#L429>`_
         '''
+        # NOTE Called only if the regular lookup has failed, so the only
+        # candidates left are attributes of the `data` and items.
+        if key == 'data':
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, key))
+
+        data = self.data
+        names, has_dict = _data_attributes(type(data))
+        if key in names or (has_dict and key in data.__dict__):
+            return getattr(data, key)
+
         try:
-            return getattr(super(folded_keys_dict, self), key)
+            return self[key]
+
+        except KeyError:
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, key)) from None
+
+
+    def __str__(self):
+        return str(self.data)
+
+
+    def __repr__(self):
+        return repr(self.data)
+
+
+    def __eq__(self, other):
+        return self.data == other.data if isinstance(other, folded_keys_dict) else other
+
+
+    def freeze(self):
+        '''
+            Make an immutable and hashable snapshot of the current content.
+        '''
+        return frozen_folded_keys_dict._from_node(self.data, self.node_factory.node_type)
 
-        except AttributeError as ex:
+
+def _freeze_value(value):
+    if isinstance(value, frozen_folded_keys_dict):
+        return value
+
+    if isinstance(value, collections.Mapping):
+        return frozen_folded_keys_dict._from_node(value, collections.Mapping)
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(item) for item in value)
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze_value(item) for item in value)
+
+    return value
+
+
+class frozen_folded_keys_dict(collections.Mapping):
+    '''
+        Immutable and hashable counterpart of `folded_keys_dict`.
+
+        Every node of the tree is an instance of this class, so a subtree
+        returned by `__getitem__` or attribute access is the stored node
+        itself rather than a new wrapper. Lists and sets inside the tree
+        are turned into tuples and frozen sets.
+
+        Instances never change after construction, so they can be shared
+        between threads w/o locking. The `set` and `delete` methods return
+        a new snapshot which shares all unchanged subtrees w/ the original.
+    '''
+
+    __slots__ = ('_data', '_value', '_hash')
+
+    def __new__(cls, data=None):
+        if isinstance(data, frozen_folded_keys_dict):
+            return data
+
+        if not isinstance(data, folded_keys_dict):
+            data = folded_keys_dict(data)
+
+        return data.freeze()
+
+
+    @classmethod
+    def _make(cls, data, value=None):
+        result = object.__new__(cls)
+        object.__setattr__(result, '_data', data)
+        object.__setattr__(result, '_value', value)
+        object.__setattr__(result, '_hash', None)
+        return result
+
+
+    @classmethod
+    def _from_node(cls, node, node_type):
+        def _make_empty(source):
+            source_data = getattr(source, 'data', source)
+            data = collections.OrderedDict() if isinstance(source_data, collections.OrderedDict) else {}
+            return cls._make(data, _freeze_value(getattr(source, 'value', None)))
+
+        result = _make_empty(node)
+        stack = [(node, result._data)]
+        while stack:
+            source, target = stack.pop()
+            for key, value in source.items():
+                if isinstance(value, frozen_folded_keys_dict):
+                    target[key] = value                     # NOTE Already frozen subtree gets shared
+                elif isinstance(value, node_type):
+                    child = _make_empty(value)
+                    target[key] = child
+                    stack.append((value, child._data))
+                else:
+                    target[key] = _freeze_value(value)
+
+        return result
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError('`{}` object is read-only'.format(type(self).__name__))
+
+
+    def __delattr__(self, name):
+        raise AttributeError('`{}` object is read-only'.format(type(self).__name__))
+
+
+    @property
+    def value(self):
+        return self._value
+
+
+    def __getitem__(self, key: str):
+        assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
+
+        return self._lookup(key, key.split('.'))
+
+
+    def _lookup(self, key, parts):
+        result = self
+        for part in parts:
+            if not isinstance(result, frozen_folded_keys_dict):
+                raise TypeError('Key not indexable: `{}`'.format(part))
             try:
-                return getattr(self.data, key)
-            except AttributeError:
-                pass
+                result = result._data[part]
+            except KeyError:
+                raise KeyError('Key not found: `{}`'.format(key))
 
-            noval = object()
+        return result
 
-            def _safe_getitem(cont, key, missing_result):
-                try:
-                    return cont[key]
 
-                except KeyError:
-                    return missing_result
+    def __contains__(self, key: str):
+        assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
 
-            result = _safe_getitem(self, key, noval)
-            if result is not noval:
-                return result
+        result = self
+        for part in key.split('.'):
+            if not isinstance(result, frozen_folded_keys_dict) or part not in result._data:
+                return False
+            result = result._data[part]
+
+        return True
 
-            message, = ex.args
-            message = message.replace('super', self.__class__.__name__, 1)
-            ex.args = message,
-            raise
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError('`{}` object has no attribute `{}`'.format(type(self).__name__, key))
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+    def __iter__(self):
+        return iter(self._data)
+
+
+    def items(self):
+        return self._data.items()
+
+
+    def keys(self):
+        return self._data.keys()
+
+
+    def values(self):
+        return self._data.values()
+
+
+    def __hash__(self):
+        if self._hash is None:
+            # NOTE Compute hashes of subtrees bottom-up to avoid deep recursion
+            pending, stack = [], [self]
+            while stack:
+                node = stack.pop()
+                pending.append(node)
+                stack.extend(
+                    child for child in node._data.values()
+                        if isinstance(child, frozen_folded_keys_dict) and child._hash is None
+                  )
+
+            for node in reversed(pending):
+                if node._hash is None:
+                    object.__setattr__(node, '_hash', hash((node._value, frozenset(node._data.items()))))
+
+        return self._hash
+
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+
+        if isinstance(other, frozen_folded_keys_dict):
+            # NOTE Compare subtrees w/ an explicit stack to avoid deep recursion
+            stack = [(self, other)]
+            while stack:
+                left, right = stack.pop()
+                if left is right:
+                    continue
+
+                if left._hash is not None and right._hash is not None and left._hash != right._hash:
+                    return False
+
+                if left._value != right._value or len(left._data) != len(right._data):
+                    return False
+
+                for key, value in left._data.items():
+                    other_value = right._data.get(key, _MISSING)
+                    if other_value is _MISSING:
+                        return False
+
+                    if isinstance(value, frozen_folded_keys_dict) and isinstance(other_value, frozen_folded_keys_dict):
+                        stack.append((value, other_value))
+
+                    elif value != other_value:
+                        return False
+
+            return True
+
+        # NOTE Freeze the other tree, so lists and sets compare equal to
+        # tuples and frozen sets made of them by `_freeze_value()`
+        if isinstance(other, folded_keys_dict):
+            return self == other.freeze()
+
+        if isinstance(other, collections.Mapping):
+            return self == frozen_folded_keys_dict._from_node(other, collections.Mapping)
+
+        return NotImplemented
 
 
     def __str__(self):
-        return str(self.data)
+        return str(self._data)
 
 
     def __repr__(self):
-        return repr(self.data)
+        if self._value is not None:
+            return '({}, {})'.format(repr(self._value), repr(self._data))
+        return repr(self._data)
 
 
-    def __eq__(self, other):
-        return self.data == other.data if isinstance(other, folded_keys_dict) else other
+    def __reduce__(self):
+        return (type(self)._make, (self._data, self._value))
+
+
+    def set(self, key: str, value):
+        '''
+            Return a new snapshot w/ the `key` assigned to the `value`.
+        '''
+        assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
+
+        parts = key.split('.')
+
+        path = [self]
+        for part in parts[:-1]:
+            node = path[-1]._data.get(part, _MISSING)
+            if node is _MISSING:
+                node = type(self)._make({})
+            elif not isinstance(node, frozen_folded_keys_dict):
+                raise TypeError('Key not indexable: `{}`'.format(part))
+            path.append(node)
+
+        if isinstance(value, collections.Mapping):
+            value = frozen_folded_keys_dict(value)
+        else:
+            value = _freeze_value(value)
+
+        return self._copy_path(path, parts, value)
+
+
+    def delete(self, key: str):
+        '''
+            Return a new snapshot w/o the `key`.
+        '''
+        assert isinstance(key, str)                         # NOTE For other type of keys this container have no sense
+
+        parts = key.split('.')
+
+        path = [self]
+        for part in parts[:-1]:
+            node = path[-1]._data.get(part, _MISSING)
+            if not isinstance(node, frozen_folded_keys_dict):
+                raise KeyError('Key not found: `{}`'.format(key))
+            path.append(node)
+
+        if parts[-1] not in path[-1]._data:
+            raise KeyError('Key not found: `{}`'.format(key))
+
+        return self._copy_path(path, parts, _MISSING)
+
+
+    def _copy_path(self, path, parts, value):
+        for node, part in zip(reversed(path), reversed(parts)):
+            data = node._data.copy()
+            if value is _MISSING:
+                del data[part]
+            else:
+                data[part] = value
+            value = type(self)._make(data, node._value)
+
+        return value
+
+
+tree_diff = collections.namedtuple('tree_diff', ['added', 'removed', 'changed'])
+
+
+def _raw_node(node):
+    if isinstance(node, frozen_folded_keys_dict):
+        return node._data
+    if isinstance(node, (folded_keys_dict, value_dict_pair, compact_node)):
+        return node.data
+    return node
+
+
+def diff(old, new):
+    '''
+        Compare two trees and return a `tree_diff` w/ sets of dotted keys
+        added, removed and changed in the `new` tree.
+
+        Trees could be instances of `folded_keys_dict`, `frozen_folded_keys_dict`
+        or nested mappings. For added or removed subtrees only the key of
+        the subtree is reported.
+
+        Identical (the same object) subtrees are skipped w/o walking
+        into them, so comparing snapshots produced by
+        `frozen_folded_keys_dict.set()` and `delete()` takes time
+        proportional to the size of the change rather than the tree.
+    '''
+    added, removed, changed = set(), set(), set()
+
+    stack = [(_raw_node(old), _raw_node(new), '')]
+    while stack:
+        old_node, new_node, prefix = stack.pop()
+
+        for key, old_value in old_node.items():
+            full_key = prefix + str(key)
+            if key not in new_node:
+                removed.add(full_key)
+                continue
+
+            new_value = new_node[key]
+            if old_value is new_value:
+                continue
+
+            if isinstance(old_value, collections.Mapping) and isinstance(new_value, collections.Mapping):
+                if getattr(old_value, 'value', None) != getattr(new_value, 'value', None):
+                    changed.add(full_key)
+                stack.append((_raw_node(old_value), _raw_node(new_value), full_key + '.'))
+
+            elif isinstance(old_value, collections.Mapping) or isinstance(new_value, collections.Mapping) \
+              or old_value != new_value:
+                changed.add(full_key)
+
+        for key in new_node.keys():
+            if key not in old_node:
+                added.add(prefix + str(key))
+
+    return tree_diff(added, removed, changed)
+
+
+MERGE_LISTS_STRATEGIES = ('replace', 'append', 'unique')
+MERGE_CONFLICTS_STRATEGIES = ('override', 'error')
+
+
+def _is_list(value):
+    return isinstance(value, (list, tuple))
+
+
+def _merge_lists(values, unique):
+    result = []
+    seen = set()
+    for value in values:
+        for item in value:
+            if unique:
+                try:
+                    if item in seen:
+                        continue
+                    seen.add(item)
+                except TypeError:
+                    # NOTE Unhashable item
+                    if item in result:
+                        continue
+            result.append(item)
+    return result
+
+
+def merge(*trees, lists='replace', conflicts='override'):
+    '''
+        Deep merge of the given trees into a new `frozen_folded_keys_dict`.
+
+        Trees could be instances of `folded_keys_dict`, `frozen_folded_keys_dict`
+        or (nested) mappings w/ dotted keys. The last tree has the highest
+        priority. Source trees are not modified.
+
+        The `lists` strategy defines what to do w/ lists found at the same
+        key in several trees: ``replace`` (take the highest priority one),
+        ``append`` (concatenate them) or ``unique`` (concatenate w/o duplicates).
+
+        The `conflicts` strategy defines what to do w/ a key which is a subtree
+        in one tree and a value in the other, or has different values:
+        ``override`` (the highest priority one wins) or ``error`` (raise
+        `ValueError`).
+
+        All trees are merged in a single pass, so the time is linear in the
+        total number of nodes. Subtrees found in only one tree are not merged
+        further, and frozen ones are shared w/ the result by reference.
+    '''
+    if lists not in MERGE_LISTS_STRATEGIES:
+        raise ValueError('Unknown lists merge strategy: `{}`'.format(lists))
+    if conflicts not in MERGE_CONFLICTS_STRATEGIES:
+        raise ValueError('Unknown conflicts merge strategy: `{}`'.format(conflicts))
+
+    trees = [
+        tree if isinstance(tree, (folded_keys_dict, frozen_folded_keys_dict)) else folded_keys_dict(tree)
+        for tree in trees
+      ]
+    if len(trees) == 1:
+        return frozen_folded_keys_dict(trees[0])
+
+    result = frozen_folded_keys_dict._make({})
+    stack = [(trees, result._data, '')]
+    while stack:
+        sources, target, prefix = stack.pop()
+
+        # Collect values of every key from the lowest to the highest priority
+        groups = collections.OrderedDict()
+        for source in sources:
+            for key, value in _raw_node(source).items():
+                group = groups.get(key)
+                if group is None:
+                    groups[key] = [value]
+                else:
+                    group.append(value)
+
+        for key, values in groups.items():
+            top = values[-1]
+            if len(values) == 1:
+                target[key] = _freeze_value(top)
+                continue
+
+            full_key = prefix + str(key)
+            is_subtree = isinstance(top, collections.Mapping)
+
+            # Take the highest priority values of the same kind
+            count = 1
+            for value in reversed(values[:-1]):
+                if isinstance(value, collections.Mapping) != is_subtree:
+                    if conflicts == 'error':
+                        raise ValueError('Key `{}` is a subtree in some trees and a value in the others'.format(full_key))
+                    break
+                count += 1
+
+            if count > 1:
+                values = values[-count:]
+            else:
+                target[key] = _freeze_value(top)
+                continue
+
+            if is_subtree:
+                child = frozen_folded_keys_dict._make({}, _freeze_value(getattr(top, 'value', None)))
+                target[key] = child
+                stack.append((values, child._data, full_key + '.'))
+
+            elif lists != 'replace' and _is_list(top):
+                tail = list(itertools.takewhile(_is_list, reversed(values)))
+                tail.reverse()
+                target[key] = _freeze_value(_merge_lists(tail, lists == 'unique'))
+
+            else:
+                if conflicts == 'error' and any(value != top for value in values):
+                    raise ValueError('Key `{}` has different values in different trees'.format(full_key))
+                target[key] = _freeze_value(top)
+
+    return result
+
+
+def _thaw_value(value):
+    if isinstance(value, frozen_folded_keys_dict):
+        return _thaw_node(value)
+
+    if isinstance(value, tuple):
+        return [_thaw_value(item) for item in value]
+
+    if isinstance(value, frozenset):
+        # NOTE Items of a set must stay hashable, so they are not thawed
+        return set(value)
+
+    return value
+
+
+def _thaw_node(tree):
+    '''
+        Make a tree of plain dictionaries from a `frozen_folded_keys_dict`.
+
+        Reverts `_freeze_value()` as well: tuples become lists and frozen
+        sets become sets (of still frozen items).
+    '''
+    result = {}
+    stack = [(tree, result)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in source.items():
+            if isinstance(value, frozen_folded_keys_dict):
+                child = target[key] = {}
+                stack.append((value, child))
+            else:
+                target[key] = _thaw_value(value)
+
+    return result
 
 
 class dict_stack(collections.Mapping):
+    '''
+        Layered lookup over several mappings.
+
+        The last given layer has the highest priority, and the
+        `writable_layer` overrides all of them. Subtrees (`folded_keys_dict`
+        or `frozen_folded_keys_dict`) found at the same key on different
+        layers get deep merged into a read-only `frozen_folded_keys_dict`.
+        A value at the key on the highest layer having it overrides subtrees
+        below, and vice versa (the same as `merge()` and `merged()` do).
+
+        Found results are memoized per key. The cache is dropped on assignment
+        via the stack; call `invalidate_cache()` after changing some
+        layer directly.
+    '''
+
+    _SUBTREE_TYPES = (folded_keys_dict, frozen_folded_keys_dict)
 
     def __init__(self, *args, writable_layer=None):
         assert functools.reduce(lambda s, x: s and issubclass(type(x), collections.Mapping), args, True)
         self._stack = list(args)
         self._stack.reverse()
         self._writable_layer = writable_layer if writable_layer is not None else {}
+        self._layers = [self._writable_layer] + self._stack
+        self._cache = {}
+
+
+    def invalidate_cache(self):
+        self._cache.clear()
 
 
     def keys(self):
-        return list(set(itertools.chain.from_iterable(c.keys() for c in self)))
+        result = collections.OrderedDict()
+        for scope in self._layers:
+            for key in scope.keys():
+                result[key] = None
+        return list(result.keys())
 
 
-    def __getitem__(self, key):
-        merged = None
-        for scope in [self._writable_layer] + self._stack:
+    def _resolve(self, key):
+        subtrees = []
+        for scope in self._layers:
             # Is key exists at the current level
             if key in scope:
                 # Yep, get it.
                 item = scope[key]
                 # If the key is partial, so `item` is a "subtree"
-                if isinstance(item, folded_keys_dict):
-                    # Yep, check if this is the first occurence...
-                    if merged is None:
-                        merged = item                       # ... then just assign it to future result.
-                    else:
-                        merged.update(item)                 # ... no, some results was found on previous levels, then merge!
+                if isinstance(item, self._SUBTREE_TYPES):
+                    subtrees.append(item)
 
                 # Ok, item is just a value. Check if prevous levels gave no partial results.
-                elif merged is None:
-                    return scope[key]                       # No! Then just return found item.
+                elif not subtrees:
+                    return item                             # No! Then just return found item.
 
                 else:
-                    raise ValueError()
+                    # NOTE A value at a lower layer is overridden by subtrees above, like by `merge()`
+                    break
+
+        if not subtrees:
+            return _MISSING
+
+        return merge(*reversed(subtrees))
 
-        if merged is None:
+
+    def merged(self):
+        '''
+            Merge all the layers into a new indexed `folded_keys_dict`.
+
+            Unlike the stack itself, lookup of any dotted key in the result
+            is a single dictionary read. The result is a snapshot: later
+            changes of the layers are not reflected. Subtree vs value
+            conflicts are resolved in favor of the higher priority layer.
+        '''
+        return folded_keys_dict(_thaw_node(merge(*reversed(self._layers))), indexed=True)
+
+
+    def _cached(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            result = self._resolve(key)
+            # NOTE Misses are not cached, so probing arbitrary keys doesn't grow the cache
+            if result is not _MISSING:
+                self._cache[key] = result
+            return result
+
+
+    def __getitem__(self, key):
+        result = self._cached(key)
+
+        if result is _MISSING:
             raise KeyError(key)
 
-        # TODO Turn `merged` into read-only
-        return merged
+        return result
+
+
+    def __contains__(self, key):
+        return self._cached(key) is not _MISSING
+
+
+    def get_many(self, paths, default=_MISSING):
+        '''
+            Get values of all given keys (strings or `key_path` instances) at once.
+        '''
+        results = []
+        for path in paths:
+            key = path.key if isinstance(path, key_path) else path
+            if default is _MISSING:
+                results.append(self[key])
+            else:
+                results.append(self.get(key, default))
+        return results
 
 
     def __setitem__(self, key, value):
         self._writable_layer[key] = value
+        self._cache.clear()
 
 
     def __len__(self):
-        return len(self._stack)
+        return len(self.keys())
 
 
     def __iter__(self):
-        return itertools.chain.from_iterable([self._writable_layer] + self._stack)
+        return iter(self.keys())
@@ -16,18 +16,47 @@
 # with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # Project specific imports
-from .yaml import ordered_dict_loader
+from .yaml import collect_includes, default_loader, lazy_mapping, load_lazy
 
 # Standard imports
 import collections
+import io
 import pathlib
+import weakref
 import yaml
 
 
+_MISSING = object()
+
+
+def _read(filename: pathlib.Path):
+    with filename.open('rb') as f:
+        return f.read()
+
+
 class items_as_attributes(collections.UserDict):
+    '''
+        Wrapper to access dictionary items as attributes.
+
+        Wrappers of nested dictionaries are cached (weakly), so repeated
+        access to the same item returns the same instance as long as the item
+        remains the same object and the wrapper is still alive.
+    '''
+
+    _INTERNAL_ATTRIBUTES = frozenset(['data', '_views', '_detached'])
+    _detached = False
 
     def __init__(self, data={}):
         self.data = data
+        self._views = weakref.WeakValueDictionary()
+
+
+    def __setattr__(self, name, value):
+        # NOTE An instance w/ custom attributes must not be returned from the views cache
+        if name not in items_as_attributes._INTERNAL_ATTRIBUTES:
+            object.__setattr__(self, '_detached', True)
+        object.__setattr__(self, name, value)
+
 
     def __getattr__(self, name):
         if name in self.data:
@@ -36,7 +65,11 @@ class items_as_attributes(collections.UserDict):
             # Check if the item is a dict itself
             # TODO What about other type of dictionaries?
             if isinstance(item, type(self.data)):
-                return items_as_attributes(item)
+                view = self._views.get(name)
+                if view is None or view.data is not item or view._detached:
+                    view = items_as_attributes(item)
+                    self._views[name] = view
+                return view
 
             # Ordinal item
             return item
@@ -46,15 +79,69 @@ class items_as_attributes(collections.UserDict):
 
 class config(collections.UserDict):
 
-    def __init__(self, filename: pathlib.Path):
-        with filename.open('r') as f:
-            data = yaml.load(f, ordered_dict_loader)
+    def __init__(self, filename: pathlib.Path, cache=None, content: bytes=None, lazy_depth=None):
+        '''
+            Load configuration data from the given YAML file.
+
+            If `cache` (an instance of `ycfg.cache.parsed_config_cache`) is given,
+            previously parsed data would be taken from it, so unchanged
+            file won't be parsed again.
+
+            If `content` is given, it is used instead of reading the `filename`.
+
+            If `lazy_depth` is given, mappings up to that depth are loaded
+            as `ycfg.yaml.lazy_mapping` and values below are constructed on
+            first access. The `cache` is not used in this mode.
+        '''
+        if content is None:
+            content = _read(filename)
 
+        if lazy_depth is not None:
+            cache = None
+
+        data = cache.load(filename, content, _MISSING) if cache is not None else _MISSING
+
+        if data is _MISSING:
+            stream = io.BytesIO(content)
+            stream.name = str(filename)                     # NOTE Used by YAML parser in error messages
+
+            if lazy_depth is not None:
+                data = load_lazy(stream, default_loader, lazy_depth)
+            else:
+                with collect_includes() as includes:
+                    data = yaml.load(stream, default_loader)
+
+            if cache is not None:
+                cache.store(filename, content, data, includes)
+
+        self._assign(data, filename)
+
+
+    @classmethod
+    def _from_document(cls, data, filename):
+        result = cls.__new__(cls)
+        result._assign(data, filename)
+        return result
+
+
+    def _assign(self, data, filename):
         if data is None:
             self.data = {}
 
-        elif not isinstance(data, collections.OrderedDict):
+        elif not isinstance(data, (collections.OrderedDict, lazy_mapping)):
             raise ValueError('Config file expected to be a YAML dictionary, but it does not: `{}`'.format(filename))
 
         else:
             self.data = data
+
+
+def load_all(filename: pathlib.Path):
+    '''
+        Iterate over documents of a multi-document YAML file.
+
+        Every document is parsed only when requested and yielded as
+        a `config` instance, so only one document is kept in memory.
+    '''
+    with filename.open('rb') as f:
+        for data in yaml.load_all(f, default_loader):
+            yield config._from_document(data, filename)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Loading configuration directories (``conf.d`` style) '''
+
+# Project specific imports
+from .collections import dict_stack, folded_keys_dict, merge as merge_trees
+from .config_file import config
+
+# Standard imports
+import concurrent.futures
+import os
+import pathlib
+
+
+def _load_data(filename):
+    return config(filename).data
+
+
+def load_directory(directory: pathlib.Path, pattern='*.yaml', max_workers=None, merge=False):
+    '''
+        Load all files matching the `pattern` in the `directory`.
+
+        Files are parsed in parallel by a pool of `max_workers` processes
+        (number of CPUs by default, ``1`` to parse in the calling
+        process). Parsed files are ordered by name, and a later file
+        overrides items of earlier ones.
+
+        Returns a `dict_stack` w/ a `folded_keys_dict` layer per file,
+        or, if `merge` is ``True``, a single deep merged `frozen_folded_keys_dict`.
+    '''
+    filenames = sorted(directory.glob(pattern), key=lambda filename: filename.name)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(filenames))
+
+    if max_workers <= 1:
+        documents = [_load_data(filename) for filename in filenames]
+
+    else:
+        chunksize = max(1, len(filenames) // (max_workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            documents = list(executor.map(_load_data, filenames, chunksize=chunksize))
+
+    layers = [folded_keys_dict(data) for data in documents]
+
+    if merge:
+        return merge_trees(*layers)
+
+    return dict_stack(*layers)
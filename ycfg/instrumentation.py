@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+    Opt-in instrumentation of configuration loading and access.
+
+    When enabled, methods of interest get replaced w/ wrappers collecting
+    timings of load phases and per dotted key access counters:
+
+        from ycfg import instrumentation
+
+        instrumentation.enable()
+        cfg = config(filename)
+        ...
+        print(instrumentation.dump_json(indent=2))
+        instrumentation.disable()
+
+    Original methods are restored by `disable()`, so there is no overhead
+    at all when the instrumentation is not enabled.
+
+    Measured load phases:
+
+    - ``read`` -- reading a file by `ycfg.config_file.config`;
+    - ``compose`` -- scanning, parsing and composing a YAML document into nodes;
+    - ``construct`` -- constructing Python objects from composed nodes;
+    - ``straighten`` -- building `folded_keys_dict` trees from dotted keys.
+
+    NOTE Phases of fragments loaded via the ``!include`` tag are counted
+    inside the ``construct`` phase of the including document as well.
+    Only outermost lookups are counted: lookups made by `dict_stack` in its
+    layers (or by an item lookup inside a membership test) are not. Lookups
+    via `get_many()` and `key_path` are counted as ``get``.
+    Counters are not synchronized, so values collected from several
+    threads at once are approximate.
+'''
+
+# Project specific imports
+from . import config_file
+from .collections import dict_stack, folded_keys_dict, key_path
+from .yaml import _ordered_dict_constructor
+
+# Standard imports
+import collections
+import functools
+import json
+import threading
+import time
+
+
+_MISSING = object()
+
+_lock = threading.Lock()
+_patches = []
+_phases = collections.OrderedDict()
+_access = collections.OrderedDict()
+_state = threading.local()
+
+
+def _record_phase(phase, seconds):
+    stats = _phases.get(phase)
+    if stats is None:
+        stats = _phases.setdefault(phase, [0, 0.0])
+    stats[0] += 1
+    stats[1] += seconds
+
+
+def _count_access(owner, operation, key):
+    counter = _access.get((owner, operation))
+    if counter is None:
+        counter = _access.setdefault((owner, operation), collections.Counter())
+    counter[key] += 1
+
+
+def _super_method(owner, name):
+    def _call(self, *args, **kwargs):
+        return getattr(super(owner, self), name)(*args, **kwargs)
+    _call.__name__ = name
+    return _call
+
+
+def _patch(owner, name, make_wrapper):
+    original = getattr(owner, name, _MISSING)
+    if original is _MISSING:
+        # NOTE A mixin w/o such method: call the next class in MRO of an instance
+        original = _super_method(owner, name)
+    _patches.append((owner, name, vars(owner).get(name, _MISSING)))
+    setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+
+
+def _timed(phase):
+    def _make_wrapper(original):
+        def _wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                _record_phase(phase, time.perf_counter() - start)
+        return _wrapper
+    return _make_wrapper
+
+
+def _counted(operation, make_keys):
+    '''
+        Make a wrapper counting accessed keys of the outermost call only,
+        so lookups made by the instrumented methods themselves (like
+        `dict_stack` looking into its layers) are not counted.
+
+        The `make_keys` gets the instance and the first argument and returns
+        the (maybe materialized) argument and a list of (owner, key) pairs.
+    '''
+    def _make_wrapper(original):
+        def _wrapper(self, arg, *args, **kwargs):
+            if _state.__dict__.get('nested', False):
+                return original(self, arg, *args, **kwargs)
+
+            arg, keys = make_keys(self, arg)
+            if not keys:
+                return original(self, arg, *args, **kwargs)
+
+            for owner, key in keys:
+                _count_access(owner, operation, key)
+
+            _state.nested = True
+            try:
+                return original(self, arg, *args, **kwargs)
+            finally:
+                _state.nested = False
+        return _wrapper
+    return _make_wrapper
+
+
+def _folded_key(self, key):
+    return key, [('folded_keys_dict', self._prefix + key)]
+
+
+def _folded_paths(self, paths):
+    paths = list(paths)
+    return paths, [
+        ('folded_keys_dict', self._prefix + (path.key if isinstance(path, key_path) else path))
+        for path in paths
+      ]
+
+
+def _stack_key(self, key):
+    return key, [('dict_stack', key)]
+
+
+def _key_path_container(self, container):
+    # NOTE Lookups of other containers are counted by the containers themselves
+    if isinstance(container, folded_keys_dict):
+        return container, [('folded_keys_dict', container._prefix + self.key)]
+    return container, []
+
+
+def is_enabled():
+    return bool(_patches)
+
+
+def enable():
+    '''
+        Start collecting timings and access counters.
+
+        Does nothing if the instrumentation is already enabled.
+    '''
+    with _lock:
+        if _patches:
+            return
+
+        _patch(config_file, '_read', _timed('read'))
+        # NOTE Wrappers set on the loaders mixin are used by all ordered loaders
+        _patch(_ordered_dict_constructor, 'get_single_node', _timed('compose'))
+        _patch(_ordered_dict_constructor, 'construct_document', _timed('construct'))
+        _patch(folded_keys_dict, '_straighten_dict', _timed('straighten'))
+
+        _patch(folded_keys_dict, '__getitem__', _counted('get', _folded_key))
+        _patch(folded_keys_dict, '__contains__', _counted('contains', _folded_key))
+        _patch(folded_keys_dict, 'get_many', _counted('get', _folded_paths))
+        _patch(key_path, '__call__', _counted('get', _key_path_container))
+        _patch(dict_stack, '__getitem__', _counted('get', _stack_key))
+        _patch(dict_stack, '__contains__', _counted('contains', _stack_key))
+
+
+def disable():
+    '''
+        Stop collecting and restore original methods.
+
+        Collected data is kept until `reset()`.
+    '''
+    with _lock:
+        while _patches:
+            owner, name, original = _patches.pop()
+            if original is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+
+
+def reset():
+    '''
+        Drop all collected data.
+    '''
+    _phases.clear()
+    _access.clear()
+
+
+def dump():
+    '''
+        Get collected data as a dictionary:
+
+            {
+                'phases': {'compose': {'calls': 1, 'seconds': 0.01}, ...}
+              , 'access': {'folded_keys_dict': {'get': {'db.host': 10, ...}, 'contains': {...}}, ...}
+            }
+
+        Access counters are ordered by count, the most accessed keys first.
+    '''
+    access = collections.OrderedDict()
+    for (owner, operation), counter in list(_access.items()):
+        access.setdefault(owner, collections.OrderedDict())[operation] = collections.OrderedDict(counter.most_common())
+
+    return collections.OrderedDict([
+        ('phases', collections.OrderedDict(
+            (phase, {'calls': calls, 'seconds': seconds})
+            for phase, (calls, seconds) in list(_phases.items())
+          ))
+      , ('access', access)
+      ])
+
+
+def dump_json(fp=None, **kwargs):
+    '''
+        Dump collected data (see `dump()`) as JSON into the given file
+        object, or return it as a string if `fp` is not given.
+    '''
+    if fp is None:
+        return json.dumps(dump(), **kwargs)
+    json.dump(dump(), fp, **kwargs)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Configuration overrides from environment variables and command line '''
+
+# Project specific imports
+from .collections import dict_stack, folded_keys_dict
+
+# Standard imports
+import os
+import re
+import yaml
+
+
+_BOOL_TAG = u'tag:yaml.org,2002:bool'
+_INT_TAG = u'tag:yaml.org,2002:int'
+
+
+class _override_loader(yaml.SafeLoader):
+    '''
+        A safe loader w/ YAML 1.2 like implicit booleans and integers:
+        only `true` and `false` are booleans, and numbers w/ leading zeros
+        (like `0755`) or sexagesimal ones (like `1:30`) are not integers.
+    '''
+    pass
+
+
+_override_loader.yaml_implicit_resolvers = {
+    first: [(tag, regexp) for tag, regexp in resolvers if tag not in (_BOOL_TAG, _INT_TAG)]
+    for first, resolvers in yaml.SafeLoader.yaml_implicit_resolvers.items()
+  }
+_override_loader.add_implicit_resolver(
+    _BOOL_TAG
+  , re.compile(r'^(?:true|True|TRUE|false|False|FALSE)$')
+  , list('tTfF')
+  )
+_override_loader.add_implicit_resolver(
+    _INT_TAG
+  , re.compile(r'^(?:[-+]?(?:0|[1-9][0-9_]*)|0x[0-9a-fA-F_]+|0o[0-7_]+)$')
+  , list('-+0123456789')
+  )
+
+
+def _parse_value(text):
+    '''
+        Parse an override value as a YAML scalar or a flow collection
+        (starting w/ `[` or `{`), so `8080` becomes `int`, `true` becomes
+        `bool` and so on (see `_override_loader` for differences from
+        YAML 1.1). Block collections (like `a: b` or `- a`) and values
+        which are not a valid YAML are taken as strings.
+    '''
+    if not text:
+        return text
+
+    try:
+        value = yaml.load(text, _override_loader)
+
+    except yaml.YAMLError:
+        return text
+
+    if isinstance(value, (dict, list)) and not text.lstrip().startswith(('[', '{')):
+        return text
+
+    return value
+
+
+def from_environ(prefix, environ=None, separator='__'):
+    '''
+        Collect overrides from environment variables into a `folded_keys_dict`.
+
+        Variables like `APP__DB__HOST` (for the `APP` prefix) give the
+        `db.host` key. Key components are lower cased.
+    '''
+    if environ is None:
+        environ = os.environ
+
+    prefix = prefix + separator
+    result = {}
+    for name, value in environ.items():
+        if name.startswith(prefix) and len(name) > len(prefix):
+            key = '.'.join(name[len(prefix):].lower().split(separator))
+            result[key] = _parse_value(value)
+
+    return folded_keys_dict(result)
+
+
+def from_argv(argv, option='--set'):
+    '''
+        Collect overrides given as `--set a.b.c=value` (or `--set=a.b.c=value`)
+        command line options into a `folded_keys_dict`.
+
+        Other arguments are ignored. Raises `ValueError` on malformed overrides.
+    '''
+    result = {}
+    args = iter(argv)
+    for arg in args:
+        if arg == option:
+            override = next(args, None)
+            if override is None:
+                raise ValueError('Option `{}` requires an argument'.format(option))
+
+        elif arg.startswith(option + '='):
+            override = arg[len(option) + 1:]
+
+        else:
+            continue
+
+        key, sep, value = override.partition('=')
+        if not sep or not key:
+            raise ValueError('Override expected to be `key=value`, but it does not: `{}`'.format(override))
+
+        result[key] = _parse_value(value)
+
+    return folded_keys_dict(result)
+
+
+def with_overrides(*layers, env_prefix=None, argv=None, environ=None):
+    '''
+        Merge given configuration layers w/ environment variables and
+        command line overrides on top of them.
+
+        The last given layer has the highest priority among `layers`,
+        environment overrides (if `env_prefix` is given) go above them
+        and command line overrides (if `argv` is given) have the highest
+        priority. Returns an indexed `folded_keys_dict` (see `dict_stack.merged()`).
+    '''
+    stack = list(layers)
+
+    if env_prefix is not None:
+        stack.append(from_environ(env_prefix, environ))
+
+    if argv is not None:
+        stack.append(from_argv(argv))
+
+    return dict_stack(*stack).merged()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Project specific imports
+from .collections import folded_keys_dict, frozen_folded_keys_dict
+from .config_file import config
+
+# Standard imports
+import collections
+import gc
+import pathlib
+import pickle
+
+
+class packed_config(collections.Mapping):
+    '''
+        Read-only configuration packed into a single bytes object.
+
+        Every top level item is serialized separately and gets decoded
+        (as `frozen_folded_keys_dict` for mappings) on first access.
+        Being created before `fork()`, the packed data stays in memory
+        pages shared by child processes: reading it doesn't touch
+        reference counters of numerous small objects, and decoded
+        items are created in the private memory of the child.
+    '''
+
+    def __init__(self, data):
+        # NOTE Straighten top level dotted keys as well
+        if not isinstance(data, (folded_keys_dict, frozen_folded_keys_dict)):
+            data = folded_keys_dict(data)
+
+        index = collections.OrderedDict()
+        chunks = []
+        offset = 0
+        for key, value in data.items():
+            if isinstance(value, collections.Mapping):
+                value = frozen_folded_keys_dict(value)
+            chunk = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            index[key] = (offset, len(chunk))
+            chunks.append(chunk)
+            offset += len(chunk)
+
+        self._blob = b''.join(chunks)
+        self._index = index
+        self._decoded = {}
+
+
+    def __getitem__(self, key):
+        section, _, rest = key.partition('.') if isinstance(key, str) else (key, None, None)
+
+        try:
+            value = self._decoded[section]
+
+        except KeyError:
+            offset, size = self._index[section]             # NOTE May throw KeyError, and that is OK
+            value = self._decoded[section] = pickle.loads(memoryview(self._blob)[offset:offset + size])
+
+        if not rest:
+            return value
+
+        # NOTE Only mappings could have nested items, so do not look for a substring or a list element
+        if not isinstance(value, frozen_folded_keys_dict):
+            raise TypeError('Key not indexable: `{}`'.format(rest.partition('.')[0]))
+
+        return value[rest]
+
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            raise AttributeError(key)
+
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError('`{}` object has no attribute `{}`'.format(type(self).__name__, key))
+
+
+    def __iter__(self):
+        return iter(self._index)
+
+
+    def __len__(self):
+        return len(self._index)
+
+
+    def __contains__(self, key):
+        section, _, rest = key.partition('.') if isinstance(key, str) else (key, None, None)
+        if section not in self._index:
+            return False
+        if not rest:
+            return True
+
+        value = self[section]
+        return isinstance(value, frozen_folded_keys_dict) and rest in value
+
+
+    @property
+    def size(self):
+        '''
+            Size of the packed data in bytes.
+        '''
+        return len(self._blob)
+
+
+class config_registry(collections.Mapping):
+    '''
+        Named configurations loaded once per process.
+
+        Load all configurations in a master process, call `seal()` and
+        then `fork()` workers. See also `packed_config`.
+    '''
+
+    def __init__(self):
+        self._configs = {}
+        self.sealed = False
+
+
+    def load(self, name, filename: pathlib.Path, **kwargs):
+        '''
+            Load a configuration file (see `ycfg.config_file.config` for
+            `kwargs`) and register it under the given `name`.
+        '''
+        return self.add(name, config(filename, **kwargs))
+
+
+    def add(self, name, data):
+        if self.sealed:
+            raise RuntimeError('Registry is sealed, no more configurations could be added')
+
+        result = self._configs[name] = packed_config(data)
+        return result
+
+
+    def seal(self):
+        '''
+            Prepare loaded configurations to be shared w/ forked processes.
+
+            Garbage produced by loading gets collected, and if possible
+            (Python 3.7+) all survived objects are moved to the permanent
+            generation, so the garbage collector of child processes never
+            touches them.
+        '''
+        self.sealed = True
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+
+    def __getitem__(self, name):
+        return self._configs[name]
+
+
+    def __iter__(self):
+        return iter(self._configs)
+
+
+    def __len__(self):
+        return len(self._configs)
+
+
+registry = config_registry()
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Typed configuration records validated against a schema '''
+
+# Project specific imports
+from .collections import folded_keys_dict, frozen_folded_keys_dict
+
+# Standard imports
+import collections
+import copy
+import keyword
+import numbers
+
+
+_MISSING = object()
+
+
+class schema_error(ValueError):
+    '''
+        Configuration data doesn't match a schema.
+
+        The dotted path to the offending item is available as `path`.
+    '''
+
+    def __init__(self, path, message):
+        super(schema_error, self).__init__('Invalid configuration item `{}`: {}'.format(path, message))
+        self.path = path
+
+
+class field:
+    '''
+        Schema item description: a `converter` callable (or a nested `schema`)
+        and an optional `default` value used when the item is missing.
+
+        The `converter` gets a raw value and returns the converted one,
+        `ValueError` or `TypeError` raised by it means a validation error.
+        If the `converter` is a type, values of that type are taken as is
+        and others are converted strictly (see `_make_type_converter`).
+
+        The `default` (unless it is `None`, meaning an optional item) gets
+        converted once here, and every loaded record gets own deep copy of it.
+    '''
+    __slots__ = ('converter', 'default', 'convert')
+
+    def __init__(self, converter, default=_MISSING):
+        self.converter = converter
+        self.convert = _make_converter(converter)
+
+        if default is not _MISSING and default is not None and self.convert is not None:
+            try:
+                default = self.convert(default)
+            except (TypeError, ValueError) as ex:
+                raise ValueError('Invalid default value `{!r}`: {}'.format(default, ex)) from ex
+
+        self.default = default
+
+
+    @property
+    def required(self):
+        return self.default is _MISSING
+
+
+class record:
+    '''
+        Base class of records generated by `schema`.
+
+        Records have `__slots__` w/ a slot per schema item, so reading
+        an item is a plain attribute load.
+    '''
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+          )
+
+
+    def __repr__(self):
+        return '{}({})'.format(
+            type(self).__name__
+          , ', '.join('{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__)
+          )
+
+
+    def as_dict(self):
+        return collections.OrderedDict(
+            (name, value.as_dict() if isinstance(value, record) else value)
+            for name, value in ((name, getattr(self, name)) for name in self.__slots__)
+          )
+
+
+def _make_record_type(name, fields):
+    return type(name, (record,), {'__slots__': fields})
+
+
+def _convert_bool(value):
+    # NOTE `bool()` would take any non empty string as `True`
+    if not isinstance(value, bool):
+        raise TypeError('expected a boolean, got `{!r}`'.format(value))
+    return value
+
+
+_COLLECTION_TYPES = (list, tuple, set, frozenset)
+
+
+def _kind(value):
+    if isinstance(value, collections.Mapping):
+        return 'a dictionary'
+    return 'a list'
+
+
+def _make_type_converter(converter):
+    '''
+        Make a strict converter to the given type.
+
+        Values of the type are taken as is. Scalars are converted to scalar
+        types only, lists to collection types only and mappings to mapping
+        types only. `None`, booleans as numbers and lossy conversion of
+        floats to integers are rejected.
+    '''
+    name = converter.__name__
+    to_collection = issubclass(converter, _COLLECTION_TYPES)
+    to_mapping = issubclass(converter, (dict, collections.Mapping))
+    to_integer = issubclass(converter, int)
+    to_number = issubclass(converter, numbers.Number)
+
+    def _convert(value):
+        if value is None:
+            raise TypeError('expected `{}`, got `None`'.format(name))
+
+        if isinstance(value, bool) and to_number:
+            raise TypeError('expected `{}`, got a boolean `{!r}`'.format(name, value))
+
+        if isinstance(value, converter):
+            return value
+
+        is_mapping = isinstance(value, collections.Mapping)
+        is_collection = isinstance(value, _COLLECTION_TYPES)
+        if (is_mapping and not to_mapping) or (is_collection and not to_collection):
+            raise TypeError('expected `{}`, got {} `{!r}`'.format(name, _kind(value), value))
+
+        if (to_mapping and not is_mapping) or (to_collection and not is_collection):
+            raise TypeError('expected `{}`, got `{!r}`'.format(name, value))
+
+        if to_integer and isinstance(value, float) and not value.is_integer():
+            raise ValueError('expected `{}`, got a fractional number `{!r}`'.format(name, value))
+
+        return converter(value)
+
+    return _convert
+
+
+def _make_converter(converter):
+    if isinstance(converter, schema):
+        return None
+    if converter is bool:
+        return _convert_bool
+    if isinstance(converter, type):
+        return _make_type_converter(converter)
+    return converter
+
+
+class schema:
+    '''
+        Schema of a configuration (sub)tree.
+
+        Items are given as keyword arguments: a converter (e.g. `int`, `str`),
+        a nested `schema` or a `field` to have a default value. Dotted keys
+        in the configuration data are handled like by `folded_keys_dict`.
+
+        The record type is generated once per schema and reused by every
+        `load()`, and all conversions are done at load time:
+
+            db = schema('db', host=str, port=field(int, 5432))
+            app = schema('app', db=db, debug=field(bool, False))
+            cfg = app.load(config(filename))
+            cfg.db.port                             # NOTE Already an `int`
+
+        Items not described by the schema are errors unless `allow_extra`
+        is set.
+    '''
+
+    def __init__(self, name, allow_extra=False, **items):
+        for key in items:
+            if keyword.iskeyword(key) or key.startswith('_'):
+                raise ValueError('Invalid schema item name: `{}`'.format(key))
+
+        self.name = name
+        self.allow_extra = allow_extra
+        self.fields = collections.OrderedDict(
+            (key, value if isinstance(value, field) else field(value))
+            for key, value in items.items()
+          )
+        self.record_type = _make_record_type(name, tuple(self.fields))
+        self._steps = tuple(
+            (key, item.converter, item.default, item.convert)
+            for key, item in self.fields.items()
+          )
+
+
+    def load(self, data):
+        '''
+            Validate and convert the given configuration data (a mapping, e.g.
+            `ycfg.config_file.config` or `folded_keys_dict`) into a record.
+
+            Raises `schema_error` pointing to the first invalid item.
+        '''
+        if isinstance(data, folded_keys_dict):
+            data = data.data
+        elif not isinstance(data, frozen_folded_keys_dict):
+            data = folded_keys_dict(data).data
+
+        # NOTE Walk the tree w/ an explicit stack of (schema, node, record, path prefix)
+        result = self.record_type.__new__(self.record_type)
+        stack = [(self, data, result, '')]
+        while stack:
+            current, node, target, prefix = stack.pop()
+
+            if not isinstance(node, collections.Mapping):
+                raise schema_error(prefix[:-1], 'expected a dictionary, got `{!r}`'.format(node))
+
+            if not current.allow_extra:
+                for key in node:
+                    if key not in current.fields:
+                        raise schema_error(prefix + str(key), 'unexpected item')
+
+            for key, converter, default, convert in current._steps:
+                path = prefix + key
+                value = node.get(key, _MISSING)
+
+                if value is _MISSING:
+                    if default is _MISSING:
+                        if convert is None:
+                            # NOTE Nested schema may have all the items defaulted
+                            value = {}
+                        else:
+                            raise schema_error(path, 'required item is missing')
+                    else:
+                        setattr(target, key, copy.deepcopy(default))
+                        continue
+
+                if convert is None:
+                    child = converter.record_type.__new__(converter.record_type)
+                    setattr(target, key, child)
+                    stack.append((converter, value, child, path + '.'))
+                    continue
+
+                try:
+                    setattr(target, key, convert(value))
+                except (TypeError, ValueError) as ex:
+                    raise schema_error(path, str(ex)) from ex
+
+        return result
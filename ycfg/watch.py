@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 Alex Turbov <i.zaufi@gmail.com>
+#
+# Trivial YAML Config is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Trivial YAML Config is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Project specific imports
+from .collections import diff
+from .config_file import config
+
+# Standard imports
+import collections
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import pathlib
+import select
+import struct
+import sys
+import threading
+
+
+def _changed_keys(old, new):
+    result = diff(old, new)
+    return result.added | result.removed | result.changed
+
+
+class _poll_watcher:
+
+    def __init__(self, filename, interval):
+        self._interval = interval
+        self._wakeup = threading.Event()
+
+
+    def wait(self):
+        self._wakeup.wait(self._interval)
+        self._wakeup.clear()
+        return True
+
+
+    def wakeup(self):
+        self._wakeup.set()
+
+
+    def close(self):
+        pass
+
+
+class _inotify_watcher:
+    '''
+        Wait for changes of a file using Linux `inotify` API.
+
+        The directory of the file gets watched, so replacing the file
+        by renaming (the way most editors save files) is noticed as well.
+    '''
+
+    _IN_MODIFY = 0x00000002
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, filename, interval):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+        self._name = os.fsencode(filename.name)
+        self._interval = interval
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        mask = self._IN_MODIFY | self._IN_CLOSE_WRITE | self._IN_MOVED_TO | self._IN_CREATE | self._IN_DELETE
+        if libc.inotify_add_watch(self._fd, os.fsencode(str(filename.parent)), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno))
+
+        self._wakeup_r, self._wakeup_w = os.pipe()
+
+
+    def wait(self):
+        ready, _, _ = select.select([self._fd, self._wakeup_r], [], [], self._interval)
+
+        if self._wakeup_r in ready:
+            os.read(self._wakeup_r, 4096)
+
+        if self._fd not in ready:
+            # NOTE Check the file periodically anyway, cuz `inotify`
+            # doesn't work for some file systems (e.g. NFS)
+            return not ready
+
+        try:
+            buffer = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return False
+
+        offset = 0
+        matched = False
+        while offset < len(buffer):
+            _, _, _, length = self._EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self._EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            matched = matched or name == self._name
+
+        return matched
+
+
+    def wakeup(self):
+        os.write(self._wakeup_w, b'\0')
+
+
+    def close(self):
+        for fd in (self._fd, self._wakeup_r, self._wakeup_w):
+            os.close(fd)
+
+
+class reloadable_config(collections.Mapping):
+    '''
+        A configuration which follows changes of the source YAML file.
+
+        The file gets watched by a background thread (use `start()` and
+        `stop()` or the `with` statement) via `inotify` on Linux or by
+        polling every `interval` seconds elsewhere. The file is parsed
+        again only if its modification time, size and content hash
+        changed. The parsed data is swapped w/ a single assignment, so
+        readers never wait for a reload and always see a complete
+        configuration.
+
+        Callbacks registered via `subscribe()` get called from the
+        reloading thread w/ this instance and a set of dotted keys changed.
+        If the new content can't be loaded, the previous one is kept and
+        the exception is stored into `last_error`.
+
+        NOTE Only the source file itself is watched: changes of fragments
+        included via the ``!include`` tag don't trigger a reload (but get
+        picked up by the next reload of the source file).
+    '''
+
+    def __init__(self, filename: pathlib.Path, interval=1.0, use_inotify=True):
+        self.filename = filename
+        self.interval = interval
+        self.use_inotify = use_inotify
+        self.last_error = None
+        self._callbacks = []
+        self._reload_lock = threading.Lock()
+        self._state = None
+        self._config = None
+        self._thread = None
+        self._watcher = None
+        self._stopping = threading.Event()
+
+        self.reload()
+
+
+    @property
+    def config(self):
+        '''
+            The current snapshot of the configuration.
+        '''
+        return self._config
+
+
+    @property
+    def data(self):
+        return self._config.data
+
+
+    def __getitem__(self, key):
+        return self._config.data[key]
+
+
+    def __iter__(self):
+        return iter(self._config.data)
+
+
+    def __len__(self):
+        return len(self._config.data)
+
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+
+    def unsubscribe(self, callback):
+        self._callbacks.remove(callback)
+
+
+    def reload(self):
+        '''
+            Reload the configuration if the source file has changed.
+
+            Returns ``True`` if the configuration has been reloaded.
+        '''
+        with self._reload_lock:
+            st = self.filename.stat()
+            if self._state is not None and self._state[:2] == (st.st_mtime_ns, st.st_size):
+                return False
+
+            with self.filename.open('rb') as f:
+                content = f.read()
+
+            state = (st.st_mtime_ns, st.st_size, hashlib.sha1(content).digest())
+            if self._state is not None and self._state[2] == state[2]:
+                self._state = state
+                return False
+
+            new_config = config(self.filename, content=content)
+            old_config, self._config = self._config, new_config
+            self._state = state
+
+        if old_config is not None:
+            changed = _changed_keys(old_config.data, new_config.data)
+            if changed:
+                for callback in list(self._callbacks):
+                    callback(self, changed)
+
+        return True
+
+
+    def _make_watcher(self):
+        if self.use_inotify and sys.platform.startswith('linux'):
+            try:
+                return _inotify_watcher(self.filename, self.interval)
+            except (AttributeError, OSError):
+                pass                                        # NOTE Fall back to polling
+
+        return _poll_watcher(self.filename, self.interval)
+
+
+    def _run(self):
+        while not self._stopping.is_set():
+            if not self._watcher.wait() or self._stopping.is_set():
+                continue
+
+            try:
+                self.reload()
+                self.last_error = None
+
+            except Exception as ex:
+                self.last_error = ex
+
+
+    def start(self):
+        assert self._thread is None
+
+        self._stopping.clear()
+        self._watcher = self._make_watcher()
+        self._thread = threading.Thread(target=self._run, name='ycfg-reload', daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._watcher.wakeup()
+        self._thread.join()
+        self._watcher.close()
+        self._thread = None
+        self._watcher = None
+
+
+    def __enter__(self):
+        self.start()
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -15,22 +15,198 @@
 
 # Standard imports
 import collections
+import contextlib
+import copy
+import io
+import os
+import pathlib
+import sys
+import threading
 import yaml
 import yaml.constructor
 
 
-class ordered_dict_loader(yaml.Loader):
+_INCLUDE_TAG = u'!include'
+
+# Parsed include fragments: (path, loader type) -> (stamps of the fragment and nested includes, data)
+_fragments = {}
+_fragments_lock = threading.Lock()
+_include_state = threading.local()
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _is_fresh(stamps):
+    try:
+        return all(_stamp(stamp[0]) == stamp for stamp in stamps)
+
+    except OSError:
+        return False
+
+
+@contextlib.contextmanager
+def collect_includes():
     '''
-        A YAML loader that loads mappings into ordered dictionaries.
+        Collect stamps (path, modification time and size) of all fragments
+        included (directly or not) by documents loaded inside the block.
 
-        See also: https://gist.github.com/enaeseth/844388
+        Use `includes_changed()` to check the collected stamps later.
+    '''
+    stamps = set()
+    frames = _include_state.__dict__.setdefault('frames', [])
+    frames.append(stamps)
+    try:
+        yield stamps
+    finally:
+        frames.pop()
+
+
+def includes_changed(stamps):
+    '''
+        Check if any fragment of the given stamps (see `collect_includes()`)
+        has been changed or removed.
+    '''
+    return not _is_fresh(stamps)
+
+
+def clear_include_cache():
+    '''
+        Drop all cached fragments loaded via the `!include` tag.
+    '''
+    with _fragments_lock:
+        _fragments.clear()
+
+
+def _load_fragment(path, loader_type):
+    '''
+        Load a fragment file w/ the given loader type.
+
+        Parsed fragments are cached per process and reused as long as the
+        fragment file and files included by it have the same modification
+        time and size. Every call returns a deep copy of cached data.
+    '''
+    key = (path, loader_type)
+    with _fragments_lock:
+        cached = _fragments.get(key)
+
+    if cached is not None and _is_fresh(cached[0]):
+        stamps, data = cached
+    else:
+        stamps = {_stamp(path)}
+
+        # NOTE Nested includes add their stamps to the current frame
+        frames = _include_state.__dict__.setdefault('frames', [])
+        frames.append(stamps)
+        try:
+            with open(path, 'rb') as f:
+                stream = io.BytesIO(f.read())
+            stream.name = path                              # NOTE Used to resolve nested includes
+            data = yaml.load(stream, loader_type)
+        finally:
+            frames.pop()
+
+        with _fragments_lock:
+            _fragments[key] = (frozenset(stamps), data)
+
+    # Let the including fragment (if any) depend on this one
+    frames = _include_state.__dict__.get('frames')
+    if frames:
+        frames[-1].update(stamps)
+
+    return copy.deepcopy(data)
+
+
+class _ordered_dict_constructor:
     '''
+        A mixin for YAML loaders to construct mappings as ordered dictionaries.
+
+        The mixin doesn't depend on a particular parser implementation,
+        so it can be combined w/ pure Python ``yaml.Loader`` as well as
+        w/ ``libyaml`` based ``yaml.CLoader``.
+
+        String keys of mappings get interned (see `sys.intern`), so
+        configurations of the same shape loaded multiple times share
+        key strings. Set `intern_values` to ``True`` in a derived class
+        to intern string values as well.
+
+        The ``!include path/to/fragment.yaml`` tag is replaced w/ the
+        content of the given file. Relative paths are resolved against
+        the directory of the including file (if the stream has a name).
+        Included fragments are parsed once per process (see `_load_fragment`).
+        See `collect_includes()` to find out which fragments a document depends on.
+    '''
+
+    intern_keys = True
+    intern_values = False
 
     def __init__(self, *args, **kwargs):
-        yaml.Loader.__init__(self, *args, **kwargs)
+        super().__init__(*args, **kwargs)
 
         self.add_constructor(u'tag:yaml.org,2002:map', type(self).construct_yaml_map)
         self.add_constructor(u'tag:yaml.org,2002:omap', type(self).construct_yaml_map)
+        self.add_constructor(_INCLUDE_TAG, type(self).construct_include)
+
+        if self.intern_values:
+            self.add_constructor(u'tag:yaml.org,2002:str', type(self).construct_interned_str)
+
+
+    def construct_interned_str(self, node):
+        return sys.intern(self.construct_yaml_str(node))
+
+
+    def construct_key(self, key_node, deep=False):
+        key = self.construct_object(key_node, deep=deep)
+        return sys.intern(key) if self.intern_keys and type(key) is str else key
+
+
+    def construct_include(self, node):
+        filename = pathlib.Path(self.construct_scalar(node))
+
+        base = node.start_mark.name
+        if not base or base.startswith('<'):                            # NOTE Like `<unicode string>`
+            base = None
+        else:
+            base = os.path.abspath(base)
+            if not filename.is_absolute():
+                filename = pathlib.Path(base).parent / filename
+
+        path = os.path.abspath(str(filename))
+
+        stack = _include_state.__dict__.setdefault('stack', [])
+        outermost = not stack
+        if outermost and base is not None:
+            stack.append(base)
+
+        try:
+            if path in stack:
+                raise yaml.constructor.ConstructorError(
+                    'while constructing an include'
+                  , node.start_mark
+                  , 'found include cycle: {}'.format(' -> '.join('`{}`'.format(p) for p in stack + [path]))
+                  , node.start_mark
+                  )
+
+            stack.append(path)
+            try:
+                return _load_fragment(path, type(self))
+
+            except OSError as ex:
+                raise yaml.constructor.ConstructorError(
+                    'while constructing an include'
+                  , node.start_mark
+                  , 'unable to read `{}`: {}'.format(path, ex.strerror)
+                  , node.start_mark
+                  )
+
+            finally:
+                stack.pop()
+
+        finally:
+            if outermost:
+                del stack[:]
 
 
     def construct_yaml_map(self, node):
@@ -55,19 +231,153 @@ class ordered_dict_loader(yaml.Loader):
 
         mapping = collections.OrderedDict()
         for key_node, value_node in node.value:
-            key = self.construct_object(key_node, deep=deep)
-            try:
-                hash(key)
-
-            except TypeError as ex:
-                raise yaml.constructor.ConstructorError(
-                    'while constructing a mapping'
-                  , node.start_mark
-                  , 'found unacceptable key `{}`'.format(ex)
-                  , key_node.start_mark
-                  )
+            key = self.construct_key(key_node, deep=deep)
+            self.check_mapping_key(node, key_node, key)
 
             value = self.construct_object(value_node, deep=deep)
             mapping[key] = value
 
         return mapping
+
+
+    def check_mapping_key(self, node, key_node, key):
+        try:
+            hash(key)
+
+        except TypeError as ex:
+            raise yaml.constructor.ConstructorError(
+                'while constructing a mapping'
+              , node.start_mark
+              , 'found unacceptable key `{}`'.format(ex)
+              , key_node.start_mark
+              )
+
+
+class ordered_dict_loader(_ordered_dict_constructor, yaml.Loader):
+    '''
+        A YAML loader that loads mappings into ordered dictionaries.
+
+        See also: https://gist.github.com/enaeseth/844388
+    '''
+    pass
+
+
+if hasattr(yaml, 'CLoader'):
+    class ordered_dict_c_loader(_ordered_dict_constructor, yaml.CLoader):
+        '''
+            The same as `ordered_dict_loader` but uses ``libyaml`` to
+            scan and parse a YAML stream.
+
+            Available only if PyYAML has been built w/ ``libyaml`` bindings.
+        '''
+        pass
+
+    default_loader = ordered_dict_c_loader
+
+else:
+    default_loader = ordered_dict_loader
+
+
+_MAP_TAG = u'tag:yaml.org,2002:map'
+
+
+class lazy_mapping(collections.MutableMapping):
+    '''
+        An ordered mapping which constructs values from composed YAML nodes
+        on first access.
+
+        Keys are constructed immediately. Values of nested mappings up to
+        the given `depth` are `lazy_mapping` instances as well, the rest are
+        kept as composed YAML nodes until requested.
+
+        NOTE Anchored values referenced from different lazily constructed
+        items become distinct (equal) objects.
+    '''
+
+    def __init__(self, node, loader_type, depth=1):
+        assert depth > 0
+        self._loader_type = loader_type
+        self._data = collections.OrderedDict()
+
+        loader = loader_type('')
+        try:
+            loader.flatten_mapping(node)
+            for key_node, value_node in node.value:
+                key = loader.construct_key(key_node)
+                loader.check_mapping_key(node, key_node, key)
+
+                if depth > 1 and isinstance(value_node, yaml.MappingNode) and value_node.tag == _MAP_TAG:
+                    self._data[key] = lazy_mapping(value_node, loader_type, depth - 1)
+                else:
+                    self._data[key] = value_node
+
+        finally:
+            loader.dispose()
+
+
+    def _construct(self, node):
+        loader = self._loader_type('')
+        try:
+            return loader.construct_document(node)
+
+        finally:
+            loader.dispose()
+
+
+    def __getitem__(self, key):
+        value = self._data[key]
+
+        if isinstance(value, yaml.Node):
+            value = self._data[key] = self._construct(value)
+
+        return value
+
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+
+    def __iter__(self):
+        return iter(self._data)
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+    def is_constructed(self, key):
+        return not isinstance(self._data[key], yaml.Node)
+
+
+    def __repr__(self):
+        return repr(collections.OrderedDict(self.items()))
+
+
+def load_lazy(stream, loader_type=default_loader, depth=1):
+    '''
+        Load a YAML document w/ a mapping at the root into `lazy_mapping`.
+
+        Other documents are constructed immediately.
+    '''
+    loader = loader_type(stream)
+    try:
+        node = loader.get_single_node()
+
+        if node is None:
+            return None
+
+        if isinstance(node, yaml.MappingNode) and node.tag == _MAP_TAG:
+            return lazy_mapping(node, loader_type, depth)
+
+        return loader.construct_document(node)
+
+    finally:
+        loader.dispose()